@@ -1,101 +1,131 @@
-import requests
+import os
+import sys
+import asyncio
 import pandas as pd
-import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# 引用仓库根目录下的公共模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crawler.metadata import MetadataStore
+from crawler.engine import AsyncHttpEngine, PermanentError, gather_limited
+from crawler.http_cache import HttpCache
+from crawler.graphql import GraphQLBatcher, NOT_FOUND
+from crawler.journal import ProgressJournal, journal_path
+from crawler.tokens import TokenPool
 
 # GitHub 配置
 GITHUB_ACCESS_TOKEN = "xxx"  # 替换为您的 GitHub Token，或者留空
-GITHUB_HEADERS = {"Authorization": f"Bearer {GITHUB_ACCESS_TOKEN}"} if GITHUB_ACCESS_TOKEN else {}
+GITHUB_HEADERS = {}
 
 # Gitee 配置
 GITEE_ACCESS_TOKEN = "xxx"  # 替换为您的 Gitee Token
-GITEE_HEADERS = {"Authorization": f"Bearer {GITEE_ACCESS_TOKEN}"} if GITEE_ACCESS_TOKEN else {}
-
-def get_rate_limit(headers):
-    """从响应头解析速率限制信息"""
-    remaining = int(headers.get("X-RateLimit-Remaining", 0))
-    reset_time = int(headers.get("X-RateLimit-Reset", time.time()))
-    return remaining, reset_time
-
-def adjust_delay(response, default_delay=1):
-    """根据速率限制调整延迟"""
-    remaining, reset_time = get_rate_limit(response.headers)
-    if remaining == 0:  # 达到限制
-        sleep_time = max(0, reset_time - time.time())
-        print(f"速率限制，等待 {sleep_time} 秒...")
-        time.sleep(sleep_time)
-    else:
-        time.sleep(default_delay)  # 正常延迟
-
-def get_repo_data(url, headers, key, default_delay=1):
-    """通用函数，用于获取 GitHub/Gitee 仓库数据，带动态延迟控制"""
-    try:
-        response = requests.get(url, headers=headers)
-        if response.status_code == 403:
-            print("403 错误，可能触发速率限制...")
-            adjust_delay(response, default_delay)  # 动态调整延迟后重试
-            return get_repo_data(url, headers, key, default_delay)
-        response.raise_for_status()
-        adjust_delay(response, default_delay)  # 正常调整延迟
-        data = response.json()
-        return data.get(key, 0)
-    except requests.HTTPError as e:
-        print(f"HTTP 错误: {e}")
-        return None
-    except requests.RequestException as e:
-        print(f"请求失败: {e}")
-        return None
+GITEE_HEADERS = {}
+
+PLATFORM_HEADERS = {"github": GITHUB_HEADERS, "gitee": GITEE_HEADERS}
 
-# GitHub API 调用函数
-def get_repo_stars_github(org, repo, default_delay=1):
-    url = f"https://api.github.com/repos/{org}/{repo}"
-    return get_repo_data(url, GITHUB_HEADERS, "stargazers_count", default_delay)
+# 令牌池：优先读取环境变量 GITHUB_TOKENS / GITEE_TOKENS 或 crawler_tokens.json，没有配置时使用上面的 Token
+token_pool = TokenPool.load(github=[GITHUB_ACCESS_TOKEN], gitee=[GITEE_ACCESS_TOKEN])
 
-def get_repo_forks_github(org, repo, default_delay=1):
-    url = f"https://api.github.com/repos/{org}/{repo}"
-    return get_repo_data(url, GITHUB_HEADERS, "forks_count", default_delay=1)
+# GitHub 仓库使用 GraphQL 批量查询（接口需要 Token），Gitee 仓库仍逐个请求 REST 接口
+USE_GRAPHQL = token_pool.has('github')
 
-# Gitee API 调用函数
-def get_repo_stars_gitee(org, repo, default_delay=1):
-    url = f"https://gitee.com/api/v5/repos/{org}/{repo}"
-    return get_repo_data(url, GITEE_HEADERS, "stargazers_count", default_delay=1)
+# 元数据表（知名度、创新性、复杂度阶段共用），表中数据在有效期内不重复请求
+metadata_store = MetadataStore()
+METADATA_MAX_AGE = 12 * 3600
 
-def get_repo_forks_gitee(org, repo, default_delay=1):
-    url = f"https://gitee.com/api/v5/repos/{org}/{repo}"
-    return get_repo_data(url, GITEE_HEADERS, "forks_count", default_delay=1)
 
 # 并发处理单个仓库
-def process_single_repo(row):
+async def process_single_repo(engine, row):
     platform = row['platform'].lower()
     repo_name = row['repo_name']
     org, repo = repo_name.split('/')  # 假设格式是 org/repo
 
-    if platform == "github":
-        stars = get_repo_stars_github(org, repo)
-        forks = get_repo_forks_github(org, repo)
-    elif platform == "gitee":
-        stars = get_repo_stars_gitee(org, repo)
-        forks = get_repo_forks_gitee(org, repo)
-    else:
+    if platform not in PLATFORM_HEADERS:
         print(f"不支持的平台 {platform}，跳过仓库 {repo_name}")
         return None
 
+    # 每个仓库只请求一次仓库接口，stars、forks、topics、默认分支等一并写入元数据表
+    # 仓库不存在等永久性错误抛出 PermanentError，由调用方记为已完成
+    headers = PLATFORM_HEADERS[platform]
+    metadata = await metadata_store.afetch(platform, org, repo,
+                                           lambda url: engine.get_json(url, headers, raise_permanent=True),
+                                           max_age=METADATA_MAX_AGE)
+
     # 如果 API 请求失败，返回 None
-    if stars is None or forks is None:
+    if metadata is None:
         print(f"获取数据失败，跳过仓库 {repo_name}")
         return None
+    return make_result(row, platform, metadata)
 
-    # 返回结果字典
+# 生成输出行
+def make_result(row, platform, metadata):
     return {
         'id': row['id'],
         'platform': platform,
-        'repo_name': repo_name,
-        'stargazers_count': stars,
-        'forks_count': forks
+        'repo_name': row['repo_name'],
+        'stargazers_count': metadata['stargazers_count'],
+        'forks_count': metadata['forks_count']
     }
 
+# 日志中的仓库标识
+def repo_key(row):
+    return str(row['id'])
+
+# GraphQL 批量查询 GitHub 仓库，元数据表中未过期的仓库不再查询
+async def collect_github_graphql(engine, rows, journal):
+    pending = {}
+    for row in rows:
+        org, repo = row['repo_name'].split('/')
+        metadata = metadata_store.get('github', row['repo_name'], METADATA_MAX_AGE)
+        if metadata is not None:
+            journal.record(repo_key(row), make_result(row, 'github', metadata))
+        else:
+            pending[(org, repo)] = row
+
+    batcher = GraphQLBatcher(engine, GITHUB_HEADERS)
+    async for results in batcher.fetch_all(list(pending)):
+        for (org, repo), item in results.items():
+            row = pending[(org, repo)]
+            if item == NOT_FOUND:
+                # 仓库不存在，重试也不会成功，记为已完成（不输出结果行）
+                print(f"仓库 {org}/{repo} 不存在，跳过")
+                journal.record(repo_key(row), None)
+                continue
+            if item is None:
+                print(f"获取数据失败，跳过仓库 {org}/{repo}")
+                journal.record(repo_key(row), None, ok=False)
+                continue
+            metadata, _ = item
+            metadata_store.upsert('github', f"{org}/{repo}", metadata)
+            journal.record(repo_key(row), make_result(row, 'github', metadata))
+
+# 异步并发获取所有仓库的数据，每个仓库完成后立即写入日志
+async def collect_repos(rows, journal, concurrency):
+    graphql_rows = [row for row in rows if USE_GRAPHQL and row['platform'].lower() == 'github']
+    rest_rows = [row for row in rows if not (USE_GRAPHQL and row['platform'].lower() == 'github')]
+    # 未变化的资源通过 304 重新验证，每个请求使用剩余配额最多的 Token
+    async with AsyncHttpEngine(cache=HttpCache(), tokens=token_pool) as engine:
+        async def collect_row(row):
+            try:
+                result = await process_single_repo(engine, row)
+            except PermanentError as e:
+                # 仓库不存在或已删除，重试也不会成功，记为已完成（不输出结果行）
+                print(f"仓库 {row['repo_name']} 不可用（{e.status}），跳过")
+                journal.record(repo_key(row), None)
+                return
+            except Exception as e:
+                print(f"处理仓库 {row['repo_name']} 时发生错误: {e}")
+                result = None
+            journal.record(repo_key(row), result, ok=result is not None)
+
+        async def collect_rest():
+            async for _ in gather_limited(collect_row, rest_rows, concurrency):
+                pass
+
+        # GraphQL 批量查询与 REST 逐个请求同时进行
+        await asyncio.gather(collect_github_graphql(engine, graphql_rows, journal), collect_rest())
+
 # 读取仓库列表文件并处理
-def process_repo_list(input_file, output_file, max_workers=5):
+def process_repo_list(input_file, output_file, concurrency=200):
     try:
         # 读取仓库列表
         repo_df = pd.read_csv(input_file)
@@ -106,31 +136,27 @@ def process_repo_list(input_file, output_file, max_workers=5):
         print(f"文件 {input_file} 为空，请检查内容。")
         return
 
-    # 用于存储结果的列表
-    result_data = []
-
-    # 使用 ThreadPoolExecutor 进行并发处理
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_row = {executor.submit(process_single_repo, row): row for _, row in repo_df.iterrows()}
-
-        for future in as_completed(future_to_row):
-            try:
-                result = future.result()
-                if result:
-                    result_data.append(result)
-            except Exception as e:
-                print(f"处理仓库时发生错误: {e}")
-
-    # 将结果转换为 DataFrame 并保存
-    try:
-        result_df = pd.DataFrame(result_data)
-        result_df.to_csv(output_file, index=False)
-        print(f"数据已保存到 {output_file}")
-    except Exception as e:
-        print(f"保存结果时出错: {e}")
+    # 结果逐条追加到日志，中断后重新运行时跳过已完成的仓库；完整运行结束后删除日志，下次运行重新采集
+    with ProgressJournal(journal_path(output_file)) as journal:
+        rows = [row for _, row in repo_df.iterrows()
+                if row['platform'].lower() in PLATFORM_HEADERS and not journal.done(repo_key(row))]
+        print(f"待处理 {len(rows)} 个仓库")
+
+        # 使用异步采集引擎并发处理，请求速率由各主机的令牌桶根据剩余配额控制
+        asyncio.run(collect_repos(rows, journal, concurrency))
+
+        # 从日志压缩出最终结果并保存
+        try:
+            result_df = pd.DataFrame(journal.results())
+            result_df.to_csv(output_file, index=False)
+            print(f"数据已保存到 {output_file}")
+        except Exception as e:
+            print(f"保存结果时出错: {e}")
+            return
+        journal.finish()
 
 # 主程序入口
 if __name__ == "__main__":
     input_file = "sampled_dataset.csv"  # 仓库列表文件路径
     output_file = "repo_metrics.csv"  # 输出文件路径
-    process_repo_list(input_file, output_file, max_workers=10)  # 设置最大线程数为 10
+    process_repo_list(input_file, output_file, concurrency=200)  # 同时处理的仓库数
@@ -0,0 +1,123 @@
+import os
+import sys
+import csv
+import json
+import argparse
+import numpy as np
+from scipy import sparse
+
+"""
+扩展名直方图矩阵与可重新加权的复杂度评分
+
+每个仓库的扩展名计数保存为稀疏矩阵（仓库 × 扩展名，scipy CSR，.npz），
+仓库与扩展名的顺序另存为 .json；复杂度得分 = 矩阵 × 权重向量，
+修改权重后无需重新采集，直接对已保存的矩阵重新计算即可。
+
+权重表格式（JSON）：{"default": 2, "weights": {".py": 3, ".yaml": 1, ...}}
+
+使用方法（按新权重重新计算）：
+    python extension_matrix.py extension_matrix --weights my_weights.json --output rescored.csv
+"""
+
+# 默认权重，与最初的 estimate_complexity 一致
+DEFAULT_WEIGHT_TABLE = {
+    'default': 2,
+    'weights': {
+        '.py': 3, '.java': 3, '.cpp': 3, '.c': 3,
+        '.properties': 1, '.yaml': 1, '.xml': 1,
+    },
+}
+
+MATRIX_PREFIX = 'extension_matrix'
+
+
+def load_weight_table(path=None):
+    """读取权重表，未指定时使用默认权重"""
+    if path is None:
+        return DEFAULT_WEIGHT_TABLE
+    with open(path, 'r', encoding='utf-8') as f:
+        table = json.load(f)
+    return {'default': table.get('default', 0), 'weights': table.get('weights', {})}
+
+
+def weight_vector(extensions, table):
+    """按矩阵的扩展名顺序生成权重向量"""
+    weights = table['weights']
+    return np.array([weights.get(ext, table['default']) for ext in extensions], dtype=np.float64)
+
+
+def score_histogram(histogram, table=DEFAULT_WEIGHT_TABLE):
+    """单个仓库的扩展名计数按权重表计算得分"""
+    weights = table['weights']
+    return sum(count * weights.get(ext, table['default']) for ext, count in histogram.items())
+
+
+def build_matrix(histograms):
+    """
+    由各仓库的扩展名计数构建稀疏矩阵
+
+    Args:
+        histograms (dict): {仓库名: {扩展名: 数量}}
+
+    Returns:
+        tuple: (CSR 矩阵, 仓库名列表, 扩展名列表)
+    """
+    repos = list(histograms)
+    extensions = sorted({ext for histogram in histograms.values() for ext in histogram})
+    ext_index = {ext: i for i, ext in enumerate(extensions)}
+    rows, cols, values = [], [], []
+    for row, repo in enumerate(repos):
+        for ext, count in histograms[repo].items():
+            rows.append(row)
+            cols.append(ext_index[ext])
+            values.append(count)
+    matrix = sparse.csr_matrix((np.array(values, dtype=np.int32), (rows, cols)),
+                               shape=(len(repos), len(extensions)))
+    return matrix, repos, extensions
+
+
+def save_matrix(matrix, repos, extensions, prefix=MATRIX_PREFIX):
+    """保存矩阵（prefix.npz）与仓库、扩展名顺序（prefix.json），先写临时文件再替换"""
+    sparse.save_npz(prefix + '.tmp.npz', matrix)
+    with open(prefix + '.json.tmp', 'w', encoding='utf-8') as f:
+        json.dump({'repos': repos, 'extensions': extensions}, f, ensure_ascii=False)
+    os.replace(prefix + '.tmp.npz', prefix + '.npz')
+    os.replace(prefix + '.json.tmp', prefix + '.json')
+
+
+def load_matrix(prefix=MATRIX_PREFIX):
+    """读取矩阵，返回 (CSR 矩阵, 仓库名列表, 扩展名列表)"""
+    matrix = sparse.load_npz(prefix + '.npz').tocsr()
+    with open(prefix + '.json', 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    return matrix, index['repos'], index['extensions']
+
+
+def score_matrix(matrix, extensions, table=DEFAULT_WEIGHT_TABLE):
+    """全部仓库的复杂度得分：一次稀疏矩阵与权重向量相乘"""
+    return matrix @ weight_vector(extensions, table)
+
+
+def rescore(prefix, table, output_file):
+    """按权重表对已保存的矩阵重新计算得分并写出 CSV（列与 complexity.py 的输出一致）"""
+    matrix, repos, extensions = load_matrix(prefix)
+    scores = score_matrix(matrix, extensions, table)
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['repo_owner', 'repo_name', 'complexity_score', 'success'])
+        for repo, score in zip(repos, scores):
+            owner, name = repo.split('/', 1)
+            writer.writerow([owner, name, int(score) if float(score).is_integer() else score, True])
+    print(f"已按新权重重新计算 {len(repos)} 个仓库，结果保存到 {output_file}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="按权重表对扩展名矩阵重新计算复杂度")
+    parser.add_argument('prefix', nargs='?', default=MATRIX_PREFIX, help="矩阵文件前缀（.npz / .json）")
+    parser.add_argument('--weights', help="权重表 JSON，默认使用内置权重")
+    parser.add_argument('--output', default='rescored_complexity.csv', help="输出 CSV")
+    args = parser.parse_args()
+    if not os.path.exists(args.prefix + '.npz'):
+        print(f"未找到矩阵文件 {args.prefix}.npz，请先运行 complexity.py")
+        sys.exit(1)
+    rescore(args.prefix, load_weight_table(args.weights), args.output)
@@ -0,0 +1,69 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+"""
+复杂度快照表
+
+记录每个仓库上次评分时默认分支的提交 SHA 与扩展名计数；
+再次运行时先用一个轻量请求取得当前 SHA，未变化的仓库直接沿用快照，只有变化的仓库才重新获取文件树并评分。
+键中包含采集方式与统计规则的版本（如 'tree:1'），不同方式得到的计数不同，切换采集方式或修改统计规则后旧快照不再命中。
+"""
+
+SNAPSHOT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'complexity_snapshots.sqlite3')
+
+
+class TreeSnapshotStore:
+    def __init__(self, path=SNAPSHOT_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            columns = [row[1] for row in conn.execute("PRAGMA table_info(tree_snapshots)")]
+            if columns and 'collection' not in columns:
+                # 旧版快照没有记录采集方式，无法判断是否可以沿用，直接丢弃
+                conn.execute("DROP TABLE tree_snapshots")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tree_snapshots ("
+                "platform TEXT NOT NULL, repo_name TEXT NOT NULL, collection TEXT NOT NULL, sha TEXT NOT NULL, "
+                "extensions TEXT NOT NULL, scored_at REAL NOT NULL, "
+                "PRIMARY KEY (platform, repo_name, collection))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, platform, repo_name, collection):
+        """
+        读取仓库在指定采集方式下的快照
+
+        Args:
+            collection (str): 采集方式与统计规则的版本，如 'tree:1'
+
+        Returns:
+            dict: {'sha', 'extensions', 'scored_at'}，不存在时返回 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT sha, extensions, scored_at FROM tree_snapshots WHERE platform = ? AND repo_name = ? AND collection = ?",
+                (platform, repo_name, collection)
+            ).fetchone()
+        if row is None:
+            return None
+        return {'sha': row[0], 'extensions': json.loads(row[1]), 'scored_at': row[2]}
+
+    def upsert(self, platform, repo_name, collection, sha, extensions):
+        """写入或更新仓库在指定采集方式下的快照"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO tree_snapshots (platform, repo_name, collection, sha, extensions, scored_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (platform, repo_name, collection, sha, json.dumps(extensions, ensure_ascii=False), time.time())
+            )
@@ -0,0 +1,82 @@
+import os
+import time
+import hashlib
+import sqlite3
+from contextlib import contextmanager
+
+"""
+README 分析缓存表
+
+以 README 文本与标签的哈希为键，记录检测出的语言、关键词数、非停用词数与创新得分；
+内容未变化的仓库（以及内容相同的模板 README、空 README）再次运行时直接读取结果，不再做语言检测与分词。
+键中包含关键词匹配器的版本，修改关键词表或匹配规则后旧记录不再命中。
+"""
+
+MEMO_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'analysis_memo.sqlite3')
+
+
+def content_key(readme_text, topics, version=''):
+    """README 文本、标签与分析版本的 SHA-256"""
+    digest = hashlib.sha256()
+    for part in (version, readme_text or '', '\n'.join(topics or [])):
+        digest.update(part.encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class AnalysisMemoStore:
+    def __init__(self, path=MEMO_DB_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS readme_analysis ("
+                "content_hash TEXT PRIMARY KEY, language TEXT NOT NULL, "
+                "keyword_count INTEGER NOT NULL, total_word_count INTEGER NOT NULL, "
+                "innovation_score REAL NOT NULL, analyzed_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key):
+        """
+        读取分析结果
+
+        Returns:
+            dict: {'language', 'keyword_count', 'total_word_count', 'innovation_score'}，不存在时返回 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT language, keyword_count, total_word_count, innovation_score "
+                "FROM readme_analysis WHERE content_hash = ?", (key,)
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return {'language': row[0], 'keyword_count': row[1], 'total_word_count': row[2], 'innovation_score': row[3]}
+
+    def upsert(self, key, analysis):
+        """写入或更新分析结果"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO readme_analysis "
+                "(content_hash, language, keyword_count, total_word_count, innovation_score, analyzed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, analysis['language'], analysis['keyword_count'], analysis['total_word_count'],
+                 analysis['innovation_score'], time.time())
+            )
+
+    def stats(self):
+        total = self.hits + self.misses
+        rate = f"{self.hits / total:.1%}" if total else "-"
+        return f"分析缓存：命中 {self.hits} 次，未命中 {self.misses} 次，命中率 {rate}"
@@ -1,22 +1,51 @@
-import requests
 import csv
 import re
 import nltk
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from nltk.stem import WordNetLemmatizer
 import os
-import concurrent.futures
+import sys
+import asyncio
 import time
-from langdetect import detect
+import concurrent.futures
+from langdetect import detect, DetectorFactory
+
+# 引用仓库根目录下的公共模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from readme_store import ReadmeStoreWriter
+from crawler.metadata import MetadataStore
+from crawler.engine import AsyncHttpEngine, gather_limited
+from crawler.http_cache import HttpCache
+from crawler.graphql import GraphQLBatcher, NOT_FOUND
+from crawler.tokens import TokenPool
+from keyword_matcher import KeywordMatcher, MATCHER_VERSION, innovation_score
+from analysis_memo import AnalysisMemoStore, content_key
 
 # GitHub Personal Access Token (可选，提高速率限制)
 GITHUB_ACCESS_TOKEN = ""
-GITHUB_HEADERS = {"Authorization": f"Bearer {GITHUB_ACCESS_TOKEN}"} if GITHUB_ACCESS_TOKEN else {}
+GITHUB_HEADERS = {}
 
 # Gitee相关配置
 GITEE_ACCESS_TOKEN = ""
-GITEE_HEADERS = {"Authorization": f"token {GITEE_ACCESS_TOKEN}", "Content-Type": "application/json"}
+GITEE_HEADERS = {"Content-Type": "application/json"}
+
+# 令牌池：优先读取环境变量 GITHUB_TOKENS / GITEE_TOKENS 或 crawler_tokens.json，没有配置时使用上面的 Token
+token_pool = TokenPool.load(github=[GITHUB_ACCESS_TOKEN], gitee=[GITEE_ACCESS_TOKEN])
+
+# 仓库元数据表（由 Sample_Data/star_fork2.py 采集），topics 与默认分支从这里读取
+metadata_store = MetadataStore()
+
+# README 分析缓存：内容未变化的 README 不再重复做语言检测与分词
+analysis_memo = AnalysisMemoStore()
+
+# langdetect 默认每次检测结果可能不同，固定随机种子使同一文本总是得到同一语言
+DetectorFactory.seed = 0
+
+# GitHub 仓库使用 GraphQL 批量查询 topics 与 README（接口需要 Token），Gitee 仓库仍逐个请求
+USE_GRAPHQL = token_pool.has('github')
+
+# 流水线配置：文本分析的进程数、阶段之间队列的容量（下游跟不上时上游暂停）、进度打印间隔（秒）
+ANALYSIS_WORKERS = os.cpu_count() or 1
+QUEUE_SIZE = 500
+REPORT_INTERVAL = 10
 
 # 下载 NLTK 数据
 def download_nltk_data():
@@ -53,70 +82,30 @@ def download_nltk_data():
 download_nltk_data()
 nltk.download('punkt_tab')
 
-# 定义获取GitHub仓库README和标签的函数
-def get_github_repo_info(org, repo):
-    readme_url = f"https://raw.githubusercontent.com/{org}/{repo}/master/README.md"
-    try:
-        readme_response = requests.get(readme_url)
-        print(f"GitHub Readme Request to {readme_url}, Status Code: {readme_response.status_code}")
-        readme_text = readme_response.text if readme_response.status_code == 200 else ""
-    except requests.RequestException as e:
-        print(f"GitHub Readme Request Error to {readme_url}: {e}")
-        readme_text = ""
-
-    api_url = f"https://api.github.com/repos/{org}/{repo}"
-    headers = GITHUB_HEADERS  # 使用 GitHub Token
-    while True:
-        try:
-            api_response = requests.get(api_url, headers=headers)
-            print(f"GitHub API Request to {api_url}, Status Code: {api_response.status_code}")
-            if api_response.status_code == 403:
-                if 'X-RateLimit-Remaining' in api_response.headers and int(
-                        api_response.headers['X-RateLimit-Remaining']) == 0:
-                    reset_time = int(api_response.headers['X-RateLimit-Reset']) - int(time.time())
-                    print(f"达到速率限制，等待 {reset_time + 1} 秒...")
-                    time.sleep(reset_time + 1)
-                    continue
-            if api_response.status_code == 200:
-                data = api_response.json()
-                topics = data.get('topics', [])
-                break
-            else:
-                topics = []
-                break
-        except requests.RequestException as e:
-            print(f"GitHub API Request Error to {api_url}: {e}")
-            topics = []
-            break
+# 关键词匹配器：依赖上面的 NLTK 数据，导入时构建一次，所有 README 共用
+keyword_matcher = KeywordMatcher()
 
+# 定义获取GitHub仓库README和标签的函数
+async def get_github_repo_info(engine, org, repo):
+    # 标签和默认分支来自元数据表，表中没有时才请求仓库接口；速率限制由采集引擎处理
+    metadata = await metadata_store.afetch('github', org, repo, lambda url: engine.get_json(url, GITHUB_HEADERS))
+    topics = metadata['topics'] if metadata else []
+    branch = metadata['default_branch'] if metadata else 'master'
+
+    readme_url = f"https://raw.githubusercontent.com/{org}/{repo}/{branch}/README.md"
+    readme_text = await engine.get_text(readme_url)
     return readme_text, topics
 
 
 # 定义获取Gitee仓库README和标签的函数
-def get_gitee_repo_info(org, repo):
-    readme_url = f"https://gitee.com/{org}/{repo}/raw/master/README.md"
-    try:
-        readme_response = requests.get(readme_url, headers=GITEE_HEADERS)  # 使用 Gitee Token
-        print(f"Gitee Readme Request to {readme_url}, Status Code: {readme_response.status_code}")
-        readme_text = readme_response.text if readme_response.status_code == 200 else ""
-    except requests.RequestException as e:
-        print(f"Gitee Readme Request Error to {readme_url}: {e}")
-        readme_text = ""
-
-    api_url = f"https://gitee.com/api/v5/repos/{org}/{repo}"
-    headers = GITEE_HEADERS  # 使用 Gitee Token
-    try:
-        api_response = requests.get(api_url, headers=headers)
-        print(f"Gitee API Request to {api_url}, Status Code: {api_response.status_code}")
-        if api_response.status_code == 200:
-            data = api_response.json()
-            topics = data.get('topics', [])
-        else:
-            topics = []
-    except requests.RequestException as e:
-        print(f"Gitee API Request Error to {api_url}: {e}")
-        topics = []
-
+async def get_gitee_repo_info(engine, org, repo):
+    # 标签和默认分支来自元数据表，表中没有时才请求仓库接口
+    metadata = await metadata_store.afetch('gitee', org, repo, lambda url: engine.get_json(url, GITEE_HEADERS))
+    topics = metadata['topics'] if metadata else []
+    branch = metadata['default_branch'] if metadata else 'master'
+
+    readme_url = f"https://gitee.com/{org}/{repo}/raw/{branch}/README.md"
+    readme_text = await engine.get_text(readme_url, GITEE_HEADERS)  # 使用 Gitee Token
     return readme_text, topics
 
 
@@ -129,61 +118,17 @@ def analyze_text(text, topics):
         print(f"语言检测失败: {e}")
         language = "en"  # 默认英语
 
-    # 语言和关键词的映射表
-    LANGUAGE_KEYWORDS = {
-        "en": ["innovation", "new", "cutting-edge", "novel", "revolutionary"],
-        "sk": ["inovácia", "nový", "prielomový", "nový", "revolučný"],
-        "ja": ["革新", "新しい", "最先端", "新規", "革命的"],
-        "es": ["innovación", "nuevo", "de vanguardia", "revolucionario", "nuevo"],
-        "de": ["Innovation", "neu", "bahnbrechend", "neuartig", "revolutionär"],
-        "it": ["innovazione", "nuovo", "avanzato", "rivoluzionario", "nuovo"],
-        "pt": ["inovação", "novo", "avançado", "revolucionário", "novo"],
-        "hu": ["innováció", "új", "úttörő", "forradalmi", "új"],
-        "hi": ["नवोन्मेष", "नया", "कटिंग-एज", "क्रांतिकारी", "नवीन"],
-        "fi": ["innovaatio", "uusi", "huipputeknologia", "uudistava", "revolutionäärinen"],
-        "sv": ["innovation", "ny", "banbrytande", "ny", "revolutionerande"],
-        "nl": ["innovatie", "nieuw", "doorbraak", "nieuw", "revolutionair"],
-        "zh": ["创新", "新", "前沿", "革命性", "新颖"],
-        "fr": ["innovation", "nouveau", "de pointe", "révolutionnaire", "novateur"],
-        "pl": ["innowacja", "nowy", "przełomowy", "rewolucyjny", "nowy"],
-        "et": ["innovatsioon", "uus", "tipptasemel", "revolutsiooniline", "uus"],
-        "hr": ["inovacija", "novi", "prekretnica", "revolucionaran", "novi"],
-        "da": ["innovation", "ny", "banebrydende", "ny", "revolutionær"],
-        "lb": ["Innovation", "nei", "bahnbrechend", "neuartig", "revolutionär"],
-        "el": ["καινοτομία", "νέο", "πρωτοποριακό", "επανάσταση", "νέο"],
-        "ru": ["инновация", "новый", "передовой", "революционный", "новаторский"],
-        "id": ["inovasi", "baru", "terdepan", "revolusioner", "baru"],
-        "ro": ["inovație", "nou", "de vârf", "revoluționar", "nou"],
-        "bg": ["иновация", "нов", "революционен", "новаторски", "нов"],
-        "sl": ["inovacija", "nov", "prelomni", "revolucionaren", "nov"],
-        "lv": ["inovācija", "jauns", "pārrāvuma", "revolucionārs", "jauns"],
-        "mt": ["innovazzjoni", "ġdid", "avvanzat", "rivoluzzjonarju", "ġdid"],
-        "th": ["นวัตกรรม", "ใหม่", "ทันสมัย", "ปฏิวัติ", "แปลกใหม่"]
-    }
-
     # 合并文本和标签
-    all_text = text + " ".join(topics)
-
-    # 根据语言选择关键词
-    keywords = LANGUAGE_KEYWORDS.get(language, LANGUAGE_KEYWORDS["en"])  # 默认英语
-
-    # 词汇处理
-    tokens = word_tokenize(all_text.lower())
-    # 根据不同语言选择停用词
-    stop_words = set(stopwords.words(language)) if language in stopwords.fileids() else set(stopwords.words('english'))
-
-    filtered_tokens = [token for token in tokens if token.isalpha() and token not in stop_words]
-    lemmatizer = WordNetLemmatizer()
-    lemmatized_tokens = [lemmatizer.lemmatize(token) for token in filtered_tokens]
-
-    # 计算创新关键词出现的次数
-    keyword_count = sum([lemmatized_tokens.count(keyword) for keyword in keywords])
-    total_word_count = len(lemmatized_tokens)
-
-    # 计算创新得分
-    innovation_score = round((keyword_count / total_word_count) * 10000, 4) if total_word_count > 0 else 0
-
-    return innovation_score
+    all_text = text + " " + " ".join(topics)
+
+    # 关键词自动机、停用词与词形还原缓存在导入时已准备好，这里只扫描一次文本
+    keyword_count, total_word_count = keyword_matcher.count(all_text, language)
+    return {
+        'language': language,
+        'keyword_count': keyword_count,
+        'total_word_count': total_word_count,
+        'innovation_score': innovation_score(keyword_count, total_word_count),
+    }
 
 
 # 从CSV文件中读取仓库信息
@@ -203,19 +148,175 @@ def read_repos_from_csv(file_path):
     return repos
 
 
-# 处理单个仓库的函数
-def process_repo(org, repo, platform, counter):
+# 获取单个仓库的 README 与标签
+async def fetch_repo(engine, org, repo, platform):
     print(f"正在处理仓库: {org}/{repo}")
     if platform == 'github':
-        readme_text, topics = get_github_repo_info(org, repo)
+        readme_text, topics = await get_github_repo_info(engine, org, repo)
     elif platform == 'gitee':
-        readme_text, topics = get_gitee_repo_info(org, repo)
+        readme_text, topics = await get_gitee_repo_info(engine, org, repo)
     else:
         print(f"不支持的平台: {platform} 对于仓库 {org}/{repo}")
         return None
+    return org, repo, readme_text, topics
+
+
+class PipelineStats:
+    """流水线各阶段的处理数量与耗时，定期打印吞吐量"""
+
+    def __init__(self, stages):
+        self.started = time.monotonic()
+        self.counts = {stage: 0 for stage in stages}
+        self.busy = {stage: 0.0 for stage in stages}  # 各阶段处理耗时之和（并发时相加）
+        self.duplicates = 0  # 同一次运行中内容重复、直接复用分析结果的 README 数
+
+    def add(self, stage, started=None):
+        self.counts[stage] += 1
+        if started is not None:
+            self.busy[stage] += time.monotonic() - started
+
+    def report(self, queues):
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        stages = "，".join(
+            f"{stage} {count} 个（{count / elapsed:.1f}/秒"
+            + (f"，平均 {self.busy[stage] / count:.3f}s" if count and self.busy[stage] else "") + "）"
+            for stage, count in self.counts.items())
+        depths = "，".join(f"{name} {queue.qsize()}/{queue.maxsize}" for name, queue in queues.items())
+        return (f"[{elapsed:.0f}s] {stages}；队列 {depths}；"
+                f"{analysis_memo.stats()}，运行内重复内容 {self.duplicates} 个")
+
+
+# 第一阶段：GraphQL 批量查询 GitHub 仓库的 topics 与 README，逐个放入分析队列
+async def fetch_github_graphql(engine, repos, analyze_queue, stats, concurrency):
+    batcher = GraphQLBatcher(engine, GITHUB_HEADERS, with_readme=True)
+    missing = {(org, repo) for org, repo, _ in repos}  # 尚未取到的仓库
+    async for results in batcher.fetch_all([(org, repo) for org, repo, _ in repos]):
+        for (org, repo), item in results.items():
+            if item is None:
+                continue
+            missing.discard((org, repo))
+            if item == NOT_FOUND:
+                # 仓库不存在：与原实现一样输出空 README，不再改用 REST 接口请求
+                stats.add('fetch')
+                await analyze_queue.put((org, repo, "", []))
+                continue
+            metadata, readme_text = item
+            metadata_store.upsert('github', f"{org}/{repo}", metadata)
+            stats.add('fetch')
+            await analyze_queue.put((org, repo, readme_text, metadata['topics']))
+
+    # 查询失败或整批出错的仓库改用 REST 接口逐个请求，与原实现一样每个仓库都有输出
+    fallback = [item for item in repos if (item[0], item[1]) in missing]
+    if fallback:
+        print(f"GraphQL 未取到 {len(fallback)} 个仓库，改用 REST 接口请求")
+        await fetch_rest(engine, fallback, analyze_queue, stats, concurrency)
+
+
+# 第一阶段：其余仓库逐个请求；分析队列已满时 put 会等待，不再发起新的请求
+async def fetch_rest(engine, repos, analyze_queue, stats, concurrency):
+    done = 0
+    async for result in gather_limited(lambda item: fetch_repo(engine, *item), repos, concurrency):
+        done += 1
+        if isinstance(result, Exception):
+            print(f"处理仓库时发生错误: {result}")
+        elif result:
+            stats.add('fetch')
+            await analyze_queue.put(result)
+        if done % 100 == 0:
+            print(f"已请求 {done}/{len(repos)} 个仓库")
+
+
+# 分析一个 README：先查分析缓存，未命中时交给进程池，结果写回缓存
+async def analyze_cached(executor, analyses, readme_text, topics, stats):
+    key = content_key(readme_text, topics, MATCHER_VERSION)
+    if key in analyses:
+        # 同一次运行中内容相同的 README（模板、空 README）只分析一次
+        stats.duplicates += 1
+        return await asyncio.shield(analyses[key])
+    analysis = analysis_memo.get(key)
+    if analysis is not None:
+        return analysis
+    future = asyncio.get_running_loop().run_in_executor(executor, analyze_text, readme_text, topics)
+    analyses[key] = future
+    try:
+        analysis = await future
+    except Exception:
+        analyses.pop(key, None)
+        raise
+    analysis_memo.upsert(key, analysis)
+    return analysis
+
 
-    innovation_score = analyze_text(readme_text, topics)
-    return {"repo": f"{org}/{repo}", "readme_text": readme_text, "innovation_score": innovation_score}
+# 第二阶段：从分析队列取出 README，交给进程池做语言检测与关键词统计
+async def analyze_worker(executor, analyses, analyze_queue, write_queue, stats):
+    while True:
+        item = await analyze_queue.get()
+        if item is None:
+            return
+        org, repo, readme_text, topics = item
+        started = time.monotonic()
+        try:
+            analysis = await analyze_cached(executor, analyses, readme_text, topics, stats)
+        except Exception as e:
+            print(f"分析仓库 {org}/{repo} 时发生错误: {e}")
+            continue
+        stats.add('analyze', started)
+        await write_queue.put({"repo": f"{org}/{repo}", "readme_text": readme_text,
+                               "innovation_score": analysis['innovation_score']})
+
+
+# 第三阶段：唯一的写出者，按完成顺序写出结果
+async def write_stage(write_queue, on_result, stats):
+    while True:
+        result = await write_queue.get()
+        if result is None:
+            return
+        on_result(result)
+        stats.add('write')
+
+
+async def report_progress(stats, queues):
+    while True:
+        await asyncio.sleep(REPORT_INTERVAL)
+        print(stats.report(queues))
+
+
+# 流水线处理全部仓库：请求（异步 I/O）-> 文本分析（进程池）-> 写出（单个写出者），阶段之间是有界队列
+async def process_repos(repos, on_result, concurrency=200, analysis_workers=ANALYSIS_WORKERS):
+    graphql_repos = [item for item in repos if USE_GRAPHQL and item[2] == 'github']
+    rest_repos = [item for item in repos if not (USE_GRAPHQL and item[2] == 'github')]
+    analyze_queue = asyncio.Queue(QUEUE_SIZE)
+    write_queue = asyncio.Queue(QUEUE_SIZE)
+    queues = {'analyze': analyze_queue, 'write': write_queue}
+    stats = PipelineStats(('fetch', 'analyze', 'write'))
+    # 每个进程同时有两个任务在途，进程处理完一个时下一个已在等待，所有核心保持忙碌
+    analyzers = analysis_workers * 2
+    analyses = {}  # 本次运行中已提交分析的内容哈希 -> Future
+
+    # 文本分析受 GIL 限制，放到进程池中才能用满所有核心
+    with concurrent.futures.ProcessPoolExecutor(analysis_workers) as executor:
+        # 未变化的资源通过 304 重新验证，每个请求使用剩余配额最多的 Token
+        async with AsyncHttpEngine(cache=HttpCache(), tokens=token_pool) as engine:
+            async def fetch_stage():
+                try:
+                    # GraphQL 批量查询与 REST 逐个请求同时进行
+                    await asyncio.gather(fetch_github_graphql(engine, graphql_repos, analyze_queue, stats, concurrency),
+                                         fetch_rest(engine, rest_repos, analyze_queue, stats, concurrency))
+                finally:
+                    for _ in range(analyzers):
+                        await analyze_queue.put(None)
+
+            async def analyze_stage():
+                await asyncio.gather(*[analyze_worker(executor, analyses, analyze_queue, write_queue, stats)
+                                       for _ in range(analyzers)])
+                await write_queue.put(None)
+
+            reporter = asyncio.create_task(report_progress(stats, queues))
+            try:
+                await asyncio.gather(fetch_stage(), analyze_stage(), write_stage(write_queue, on_result, stats))
+            finally:
+                reporter.cancel()
+    print(stats.report(queues))
 
 
 # 主函数
@@ -223,13 +324,13 @@ def main():
     csv_file_path = 'cold/cold_repositories.csv'
     output_file_path_innovation = 'repo_innovation_scores.csv'
     output_file_path_readme = 'repo_readme_contents.csv'
+    output_readme_store = 'repo_readme_store'  # 网页服务直接读取的 README 存储（.dat + .idx.json）
 
     repos = read_repos_from_csv(csv_file_path)
-    page_size = 20
-    num_pages = len(repos) // page_size + (1 if len(repos) % page_size != 0 else 0)
 
     with open(output_file_path_innovation, 'w', newline='', encoding='utf-8') as csvfile_innovation, \
-            open(output_file_path_readme, 'w', newline='', encoding='utf-8') as csvfile_readme:
+            open(output_file_path_readme, 'w', newline='', encoding='utf-8') as csvfile_readme, \
+            ReadmeStoreWriter(output_readme_store) as readme_store_writer:
 
         fieldnames_innovation = ['repo', 'innovation_score']
         writer_innovation = csv.DictWriter(csvfile_innovation, fieldnames=fieldnames_innovation)
@@ -239,23 +340,13 @@ def main():
         writer_readme = csv.DictWriter(csvfile_readme, fieldnames=fieldnames_readme)
         writer_readme.writeheader()
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            for page in range(num_pages):
-                start = page * page_size
-                end = min((page + 1) * page_size, len(repos))
-                current_repos = repos[start:end]
-                print(f"正在处理第 {page + 1} 页，仓库范围: {start}-{end - 1}")
-
-                futures = [executor.submit(process_repo, org, repo, platform, idx + 1) for idx, (org, repo, platform) in
-                           enumerate(current_repos)]
-                for future in concurrent.futures.as_completed(futures):
-                    result = future.result()
-                    if result:
-                        writer_innovation.writerow(
-                            {"repo": result["repo"], "innovation_score": result["innovation_score"]})
-                        writer_readme.writerow({"repo": result["repo"], "readme_text": result["readme_text"]})
-
-                print(f"第 {page + 1} 页处理完成")
+        def write_result(result):
+            writer_innovation.writerow({"repo": result["repo"], "innovation_score": result["innovation_score"]})
+            writer_readme.writerow({"repo": result["repo"], "readme_text": result["readme_text"]})
+            readme_store_writer.add(result["repo"], result["readme_text"])
+
+        # 请求、分析、写出三个阶段流水线并行，慢仓库不会拖住其他仓库
+        asyncio.run(process_repos(repos, write_result))
 
 
 # 运行主函数
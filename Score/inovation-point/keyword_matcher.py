@@ -0,0 +1,208 @@
+import re
+import json
+import hashlib
+import functools
+from collections import deque
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+from nltk.stem import WordNetLemmatizer
+
+"""
+创新关键词匹配
+
+关键词表、各语言的停用词集合与词形还原都在导入时（或首次使用时）准备好，每个 README 只做一次扫描：
+正文分词并去掉停用词后送入该语言的关键词自动机（以词为单位的 Aho–Corasick），关键词次数（分子）与
+总词数（分母）基于同一个词序列。关键词按与正文相同的方式分词、去停用词和还原，多词关键词
+（"cutting-edge"、"de vanguardia"、"de pointe"）也能匹配。
+中文、日文、泰文的分词结果不可靠，改为按字符匹配，词序列换成去掉停用词后的字符（夹杂的英文单词按词计）。
+两种方式都从左到右取最长且互不重叠的匹配，已计入的关键词内部的短关键词（"创新"中的"新"）不再重复计数。
+"""
+
+# 语言和关键词的映射表
+LANGUAGE_KEYWORDS = {
+    "en": ["innovation", "new", "cutting-edge", "novel", "revolutionary"],
+    "sk": ["inovácia", "nový", "prielomový", "nový", "revolučný"],
+    "ja": ["革新", "新しい", "最先端", "新規", "革命的"],
+    "es": ["innovación", "nuevo", "de vanguardia", "revolucionario", "nuevo"],
+    "de": ["Innovation", "neu", "bahnbrechend", "neuartig", "revolutionär"],
+    "it": ["innovazione", "nuovo", "avanzato", "rivoluzionario", "nuovo"],
+    "pt": ["inovação", "novo", "avançado", "revolucionário", "novo"],
+    "hu": ["innováció", "új", "úttörő", "forradalmi", "új"],
+    "hi": ["नवोन्मेष", "नया", "कटिंग-एज", "क्रांतिकारी", "नवीन"],
+    "fi": ["innovaatio", "uusi", "huipputeknologia", "uudistava", "revolutionäärinen"],
+    "sv": ["innovation", "ny", "banbrytande", "ny", "revolutionerande"],
+    "nl": ["innovatie", "nieuw", "doorbraak", "nieuw", "revolutionair"],
+    "zh": ["创新", "新", "前沿", "革命性", "新颖"],
+    "fr": ["innovation", "nouveau", "de pointe", "révolutionnaire", "novateur"],
+    "pl": ["innowacja", "nowy", "przełomowy", "rewolucyjny", "nowy"],
+    "et": ["innovatsioon", "uus", "tipptasemel", "revolutsiooniline", "uus"],
+    "hr": ["inovacija", "novi", "prekretnica", "revolucionaran", "novi"],
+    "da": ["innovation", "ny", "banebrydende", "ny", "revolutionær"],
+    "lb": ["Innovation", "nei", "bahnbrechend", "neuartig", "revolutionär"],
+    "el": ["καινοτομία", "νέο", "πρωτοποριακό", "επανάσταση", "νέο"],
+    "ru": ["инновация", "новый", "передовой", "революционный", "новаторский"],
+    "id": ["inovasi", "baru", "terdepan", "revolusioner", "baru"],
+    "ro": ["inovație", "nou", "de vârf", "revoluționar", "nou"],
+    "bg": ["иновация", "нов", "революционен", "новаторски", "нов"],
+    "sl": ["inovacija", "nov", "prelomni", "revolucionaren", "nov"],
+    "lv": ["inovācija", "jauns", "pārrāvuma", "revolucionārs", "jauns"],
+    "mt": ["innovazzjoni", "ġdid", "avvanzat", "rivoluzzjonarju", "ġdid"],
+    "th": ["นวัตกรรม", "ใหม่", "ทันสมัย", "ปฏิวัติ", "แปลกใหม่"]
+}
+
+# langdetect 的语言代码 -> NLTK 停用词表名称，没有对应停用词表的语言（日文、泰文等）不去停用词
+STOPWORD_LANGUAGES = {
+    "en": "english", "es": "spanish", "de": "german", "it": "italian", "pt": "portuguese",
+    "hu": "hungarian", "fi": "finnish", "sv": "swedish", "nl": "dutch", "fr": "french",
+    "da": "danish", "el": "greek", "ru": "russian", "id": "indonesian", "ro": "romanian",
+    "sl": "slovene", "zh": "chinese",
+}
+
+# 不以空格分词的语言，在原文上按字符匹配关键词
+CHAR_LEVEL_LANGUAGES = {"zh", "ja", "th"}
+
+# 按字符匹配的语言中的计数单位：ASCII 字母组成的单词整体算一个，其他文字每个字符算一个
+CHAR_UNIT_RE = re.compile(r'[a-z]+|[^\W\d_a-z]')
+
+# 匹配规则修改后递增；与关键词表、停用词语言表一起构成匹配器版本，分析缓存按版本区分
+MATCHER_REVISION = 3
+MATCHER_VERSION = f"{MATCHER_REVISION}:" + hashlib.sha1(json.dumps(
+    [LANGUAGE_KEYWORDS, STOPWORD_LANGUAGES, sorted(CHAR_LEVEL_LANGUAGES)],
+    ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+_lemmatizer = WordNetLemmatizer()
+
+
+@functools.lru_cache(maxsize=200000)
+def lemmatize(token):
+    """词形还原（带缓存，README 中的词大量重复）"""
+    return _lemmatizer.lemmatize(token)
+
+
+@functools.lru_cache(maxsize=None)
+def stopword_set(language):
+    """语言对应的停用词集合，每种语言只读取一次；没有停用词表的语言为空集合"""
+    name = STOPWORD_LANGUAGES.get(language)
+    return frozenset(stopwords.words(name)) if name else frozenset()
+
+
+def char_units(text, stop_words=frozenset()):
+    """按字符匹配的语言中的计数单位（已转小写），去掉停用词"""
+    return [unit for unit in CHAR_UNIT_RE.findall(text.lower()) if unit not in stop_words]
+
+
+def normalize_tokens(text, stop_words=frozenset()):
+    """分词、转小写、按连字符拆开、去掉停用词并做词形还原，只保留字母组成的词"""
+    for token in word_tokenize(text.lower()):
+        for part in token.split('-'):
+            if part.isalpha() and part not in stop_words:
+                yield lemmatize(part)
+
+
+class PhraseAutomaton:
+    """以词（或字符）为单位的 Aho–Corasick 自动机，一次扫描统计短语的出现次数"""
+
+    def __init__(self, phrases):
+        self.goto = [{}]
+        self.fail = [0]
+        self.lengths = [()]  # 以该状态结尾的各短语长度（含失败链上的）
+        for phrase in set(phrases):
+            if not phrase:
+                continue
+            node = 0
+            for symbol in phrase:
+                nxt = self.goto[node].get(symbol)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[node][symbol] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.lengths.append(())
+                node = nxt
+            self.lengths[node] += (len(phrase),)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for symbol, nxt in self.goto[node].items():
+                queue.append(nxt)
+                fail = self.fail[node]
+                while fail and symbol not in self.goto[fail]:
+                    fail = self.fail[fail]
+                target = self.goto[fail].get(symbol, 0)
+                self.fail[nxt] = target if target != nxt else 0
+                self.lengths[nxt] += self.lengths[self.fail[nxt]]
+
+    def count_non_overlapping(self, symbols):
+        """从左到右取最长的匹配，统计互不重叠的短语出现次数"""
+        goto, fail, lengths = self.goto, self.fail, self.lengths
+        matches = []
+        node = 0
+        for end, symbol in enumerate(symbols):
+            while node and symbol not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(symbol, 0)
+            for length in lengths[node]:
+                matches.append((end - length + 1, -length))
+        matches.sort()  # 起点靠前的优先，起点相同时较长的优先
+        total = 0
+        covered = -1  # 已取匹配覆盖到的最后位置
+        for start, negative_length in matches:
+            if start > covered:
+                total += 1
+                covered = start - negative_length - 1
+        return total
+
+
+class KeywordMatcher:
+    def __init__(self, language_keywords=LANGUAGE_KEYWORDS):
+        self.token_automata = {}
+        self.char_automata = {}
+        for language, keywords in language_keywords.items():
+            # 关键词与正文使用同一个停用词过滤，只由停用词组成的关键词不参与匹配
+            stop_words = stopword_set(language)
+            if language in CHAR_LEVEL_LANGUAGES:
+                self.char_automata[language] = PhraseAutomaton(
+                    tuple(char_units(keyword, stop_words)) for keyword in keywords)
+            else:
+                self.token_automata[language] = PhraseAutomaton(
+                    tuple(normalize_tokens(keyword, stop_words)) for keyword in keywords)
+
+    @staticmethod
+    def base_language(language):
+        """langdetect 的 zh-cn / zh-tw 等代码归到 zh"""
+        return (language or "en").split('-')[0].lower()
+
+    def resolve_language(self, language):
+        """有关键词表的语言代码，没有时使用英语"""
+        language = self.base_language(language)
+        if language not in self.token_automata and language not in self.char_automata:
+            return "en"  # 默认英语
+        return language
+
+    def count(self, text, language):
+        """
+        一次扫描统计关键词出现次数（互不重叠）与非停用词总数，两者基于同一个去掉停用词的序列
+
+        Args:
+            text (str): README 与标签合并后的文本
+            language (str): langdetect 检测出的语言代码
+
+        Returns:
+            tuple: (关键词出现次数, 非停用词总数)，按字符匹配的语言中总数为非停用字符（及英文单词）数
+        """
+        language = self.resolve_language(language)
+        stop_words = stopword_set(language)
+        if language in self.char_automata:
+            units = char_units(text, stop_words)
+            return self.char_automata[language].count_non_overlapping(units), len(units)
+        tokens = list(normalize_tokens(text, stop_words))
+        return self.token_automata[language].count_non_overlapping(tokens), len(tokens)
+
+    def score(self, text, language):
+        """创新得分：关键词出现次数 / 非停用词总数 × 10000"""
+        return innovation_score(*self.count(text, language))
+
+
+def innovation_score(keyword_count, total_word_count):
+    return round((keyword_count / total_word_count) * 10000, 4) if total_word_count > 0 else 0
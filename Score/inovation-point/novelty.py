@@ -0,0 +1,187 @@
+import os
+import re
+import sys
+import csv
+import time
+import argparse
+import numpy as np
+from scipy import sparse
+
+# 引用仓库根目录下的公共模块
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+import readme_store
+
+"""
+基于语料的新颖度评分
+
+cre6.py 的创新得分是逐个 README 统计几个关键词的出现频率；这里换一种做法，对全部 README 一次性构建
+TF-IDF 稀疏矩阵（仓库 × 词，scipy CSR），按每个仓库与整个语料的差异给出新颖度：
+    centroid  与语料中心（所有 README 向量的平均方向）的余弦距离，一次稀疏矩阵与向量相乘即可完成
+    knn       与最相似的 k 个 README 的平均余弦距离，分块计算相似度，较慢但能区分"小众但成群"的仓库
+新颖度在 0~1 之间，乘以 10000 后写入与 cre6.py 相同格式的 repo_innovation_scores.csv（repo, innovation_score），
+screen_data/total.csv 可以直接使用。
+
+README 来源：cre6.py 写出的 README 存储（repo_readme_store.dat / .idx.json），不存在时读取 repo_readme_contents.csv。
+
+使用方法：
+    python novelty.py [--source repo_readme_store] [--method centroid|knn] [--output repo_innovation_scores.csv]
+"""
+
+# 词：至少两个字母（含各语言文字），不含数字与下划线；中日文等连续文字整段作为一个词
+TOKEN_RE = re.compile(r"[^\W\d_]{2,}")
+
+MIN_DF = 2  # 出现在少于 MIN_DF 个 README 中的词忽略（拼写错误、哈希、链接片段）
+MAX_DF = 0.5  # 出现在超过该比例 README 中的词忽略（相当于停用词）
+KNN_K = 10
+KNN_CHUNK = 1000  # knn 每次计算多少行的相似度
+
+
+def read_readmes(source):
+    """
+    读取全部 README
+
+    Args:
+        source (str): README 存储前缀或 repo,readme_text 格式的 CSV
+
+    Returns:
+        tuple: (仓库名列表, README 文本列表)
+    """
+    repos, texts = [], []
+    if readme_store.exists(source):
+        store = readme_store.ReadmeStore(source)
+        try:
+            for repo in store:
+                repos.append(repo)
+                texts.append(store.get_text(repo))
+        finally:
+            store.close()
+    else:
+        csv.field_size_limit(2 ** 31 - 1)  # README 可能超过默认的字段长度限制
+        with open(source, 'r', newline='', encoding='utf-8') as csvfile:
+            for row in csv.DictReader(csvfile):
+                repos.append(row['repo'])
+                texts.append(row['readme_text'] or '')
+    return repos, texts
+
+
+def term_matrix(texts):
+    """
+    一次扫描构建词频矩阵
+
+    Returns:
+        tuple: (CSR 词频矩阵, 词表 dict 词 -> 列号)
+    """
+    vocabulary = {}
+    indices = []
+    indptr = [0]
+    for text in texts:
+        indices.extend(vocabulary.setdefault(token, len(vocabulary)) for token in TOKEN_RE.findall(text.lower()))
+        indptr.append(len(indices))
+    indices = np.array(indices, dtype=np.int32)
+    data = np.ones(len(indices), dtype=np.float32)
+    matrix = sparse.csr_matrix((data, indices, np.array(indptr, dtype=np.int64)),
+                               shape=(len(texts), len(vocabulary)))
+    matrix.sum_duplicates()  # 同一 README 中重复的词合并为计数
+    return matrix, vocabulary
+
+
+def tfidf(counts, min_df=MIN_DF, max_df=MAX_DF):
+    """
+    词频矩阵转为行归一化的 TF-IDF 矩阵
+
+    tf 取 1 + log(计数)，idf 取 log((1 + 文档数) / (1 + 文档频率)) + 1；
+    按文档频率过滤掉过于罕见和过于常见的词，每行做 L2 归一化，行与行的点积即余弦相似度。
+    """
+    n_docs = counts.shape[0]
+    df = np.bincount(counts.indices, minlength=counts.shape[1])
+    keep = np.flatnonzero((df >= min_df) & (df <= max_df * n_docs))
+    matrix = counts[:, keep].tocsr()
+    matrix.data = 1 + np.log(matrix.data)
+    idf = (np.log((1 + n_docs) / (1 + df[keep])) + 1).astype(np.float32)
+    matrix = matrix @ sparse.diags(idf)
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags((1 / norms).astype(np.float32)) @ matrix
+
+
+def centroid_novelty(matrix):
+    """与语料中心方向的余弦距离"""
+    centroid = np.asarray(matrix.mean(axis=0)).ravel()
+    centroid /= max(np.linalg.norm(centroid), 1e-12)
+    return 1 - matrix @ centroid
+
+
+def knn_novelty(matrix, k=KNN_K, chunk=KNN_CHUNK):
+    """与最相似的 k 个 README（不含自身）的平均余弦距离，分块计算避免一次生成完整的相似度矩阵"""
+    n_docs = matrix.shape[0]
+    k = min(k, n_docs - 1)
+    novelty = np.zeros(n_docs, dtype=np.float32)
+    if k <= 0:
+        return novelty
+    transposed = matrix.T.tocsr()
+    for start in range(0, n_docs, chunk):
+        stop = min(start + chunk, n_docs)
+        similarity = (matrix[start:stop] @ transposed).toarray()
+        similarity[np.arange(stop - start), np.arange(start, stop)] = -np.inf  # 排除自身
+        nearest = np.partition(similarity, -k, axis=1)[:, -k:]
+        novelty[start:stop] = 1 - nearest.mean(axis=1)
+    return novelty
+
+
+def novelty_scores(texts, method='centroid', min_df=MIN_DF, max_df=MAX_DF, k=KNN_K):
+    """
+    计算全部 README 的新颖度
+
+    Args:
+        texts (list): README 文本
+        method (str): centroid 或 knn
+        min_df (int): 最小文档频率
+        max_df (float): 最大文档频率（比例）
+        k (int): knn 的近邻数
+
+    Returns:
+        numpy.ndarray: 新颖度（0~1），没有可用词的 README 为 0
+    """
+    matrix = tfidf(term_matrix(texts)[0], min_df, max_df)
+    if method == 'knn':
+        novelty = knn_novelty(matrix, k)
+    else:
+        novelty = centroid_novelty(matrix)
+    novelty = np.clip(novelty, 0, 1)
+    novelty[matrix.getnnz(axis=1) == 0] = 0
+    return novelty
+
+
+def save_scores(repos, novelty, output_file):
+    """写出与 cre6.py 相同格式的 CSV"""
+    with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['repo', 'innovation_score'])
+        for repo, value in zip(repos, novelty):
+            writer.writerow([repo, round(float(value) * 10000, 4)])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="基于 TF-IDF 的 README 新颖度评分")
+    parser.add_argument('--source', default='repo_readme_store',
+                        help="README 存储前缀或 repo,readme_text 格式的 CSV，默认 repo_readme_store")
+    parser.add_argument('--method', choices=['centroid', 'knn'], default='centroid', help="新颖度的计算方式")
+    parser.add_argument('--k', type=int, default=KNN_K, help="knn 的近邻数")
+    parser.add_argument('--min-df', type=int, default=MIN_DF, help="最小文档频率")
+    parser.add_argument('--max-df', type=float, default=MAX_DF, help="最大文档频率（比例）")
+    parser.add_argument('--output', default='repo_innovation_scores.csv', help="输出 CSV")
+    args = parser.parse_args()
+
+    source = args.source
+    if not readme_store.exists(source) and not os.path.exists(source):
+        source = 'repo_readme_contents.csv'
+        if not os.path.exists(source):
+            print(f"未找到 README 存储 {args.source} 或 {source}，请先运行 cre6.py")
+            sys.exit(1)
+
+    started = time.time()
+    repos, texts = read_readmes(source)
+    print(f"从 {source} 读取了 {len(repos)} 个 README")
+    novelty = novelty_scores(texts, args.method, args.min_df, args.max_df, args.k)
+    save_scores(repos, novelty, args.output)
+    print(f"新颖度（{args.method}）计算完成，耗时 {time.time() - started:.1f} 秒，结果保存到 {args.output}")
@@ -1,90 +1,188 @@
 import os
-from flask import Flask, render_template, request, jsonify
-import pandas as pd
-from wordcloud import WordCloud
-import matplotlib.pyplot as plt
-import requests
+from flask import Flask, render_template, request, jsonify, Response
 import json
 import time
+import gzip
+import hashlib
+import numpy as np
+import pandas as pd
+from collections import namedtuple
+from serving_data import load_serving_data
+from wordcloud_cache import get_wordcloud, WORDCLOUD_DIR
+from llm_cache import LLMResponseCache
+from llm_jobs import AnalysisJobQueue
+from llm_client import LLMClient
 
 app = Flask(__name__)
 
-# 加载数据
-total_data_path = 'screen_data/total.csv'
-source_data_path = 'screen_data/source.csv'
-readme_data_path = 'screen_data/repo_readme_contents.csv'
-
-# 加载评分数据
-total_data = pd.read_csv(total_data_path, encoding='utf-8')
-for col in ['complexity_score', 'innovation_score', 'popularity_score']:
-    total_data[col] = pd.to_numeric(total_data[col], errors='coerce')  # 确保数值列为浮点型
-total_data['repo_name'] = total_data['repo_name'].astype(str)  # 确保仓库名为字符串
-total_data.fillna(0, inplace=True)  # 填充缺失值为 0
-
-# 动态计算加权分数
-total_data['weighted_score'] = (
-        total_data['complexity_score'] +
-        total_data['innovation_score'] -
-        total_data['popularity_score']
-)
-
-# 加载 README 数据
-readme_data = pd.read_csv(readme_data_path, encoding='utf-8')
-readme_data['repo'] = readme_data['repo'].astype(str)  # 确保仓库名为字符串
-
-# 合并来源数据
-source_data = pd.read_csv(source_data_path, encoding='utf-8')
-total_data = total_data.merge(source_data, on='repo_name', how='left')  # 左连接，基于 repo_name 合并
-
-# 根据 platform 和 repo_name 生成 source 列
-total_data['source'] = total_data.apply(
-    lambda row: f"https://{row['platform']}.com/{row['repo_name']}" if pd.notna(row['platform']) else "未知", axis=1
-)
+RankingSnapshot = namedtuple('RankingSnapshot', [
+    'grouped_repos',  # 综合评分前 100 名，按 20 个一组分组
+    'source_links',  # 前 100 名仓库 -> 来源链接
+    'top_complexity',  # 复杂性评分前 10 名
+    'top_innovation',  # 创新性评分前 10 名
+    'top_weighted_dropdown',  # 综合评分前 10 名，用于下拉框
+])
 
-# 确保词云图片的保存目录存在
-if not os.path.exists('static/wordclouds'):
-    os.makedirs('static/wordclouds')
-
-# 生成柱状图（前 10 项目）
-top_projects = total_data.nlargest(100, 'weighted_score')
-plt.figure(figsize=(10, 6))
-plt.barh(top_projects['repo_name'].head(10), top_projects['weighted_score'].head(10), color='skyblue')
-plt.xlabel('Weighted Score')
-plt.ylabel('Repository Name')
-plt.title('Top 10 Repositories by Weighted Score')
-plt.gca().invert_yaxis()
-
-if not os.path.exists('static'):
-    os.makedirs('static')  # 确保 static 文件夹存在
-chart_path = os.path.join('static', 'top_projects_chart.png')
-plt.savefig(chart_path)
-plt.close()
 
-# 云端大模型API调用函数
-def call_cloud_llm(prompt, max_tokens=300, retry=3):
+def build_ranking_snapshot(data, top_n=100, group_size=20, top_k=10):
     """
-    调用云端大语言模型API
+    根据评分数据构建首页所需的排行快照，数据加载后只计算一次
 
     Args:
-        prompt (str): 输入提示文本
-        max_tokens (int): 生成的最大token数
-        retry (int): 重试次数
+        data (DataFrame): 评分数据，需包含 weighted_score 与 source 列
+        top_n (int): 综合评分排行的仓库数量
+        group_size (int): 轮播展示时每组的仓库数量
+        top_k (int): 复杂性、创新性排行的仓库数量
 
     Returns:
-        str: 模型生成的文本
+        RankingSnapshot: 首页渲染所需的全部排行数据
+    """
+    top_repos = data.nlargest(top_n, 'weighted_score')[['repo_name', 'weighted_score', 'source']]
+    top_records = top_repos[['repo_name', 'weighted_score']].to_dict(orient='records')
+    grouped_repos = tuple(
+        tuple(top_records[i:i + group_size]) for i in range(0, top_n, group_size)
+    )
+    # 前端只会为轮播中的仓库生成跳转链接，无需携带全部仓库的映射
+    source_links = dict(zip(top_repos['repo_name'], top_repos['source']))
+
+    top_complexity = data.nlargest(top_k, 'complexity_score')[['repo_name', 'complexity_score']].to_dict(
+        orient='records')
+    top_innovation = data.nlargest(top_k, 'innovation_score')[['repo_name', 'innovation_score']].to_dict(
+        orient='records')
+
+    return RankingSnapshot(
+        grouped_repos=grouped_repos,
+        source_links=source_links,
+        top_complexity=tuple(top_complexity),
+        top_innovation=tuple(top_innovation),
+        top_weighted_dropdown=tuple(top_records[:top_k]),
+    )
+
+
+def build_repo_index(names):
     """
+    构建仓库名到行位置的映射，查找时只需一次哈希探测
 
-    # 明确指定API配置信息
-    api_key = os.getenv("CLOUD_LLM_API_KEY", "xxx")  # 实际使用时替换为您的API密钥
-    api_url = "https://chat.ecnu.edu.cn/open/api/v1/chat/completions"  # 明确指定URL
+    Args:
+        names (Series): 仓库名列
 
-    headers = {
-        "Authorization": f"Bearer {api_key}",
-        "Content-Type": "application/json"
-    }
+    Returns:
+        dict: 仓库名 -> 行位置（重复仓库名保留第一次出现的位置）
+    """
+    positions = range(len(names) - 1, -1, -1)
+    # 倒序写入，使得重复的仓库名最终保留第一次出现的位置
+    return dict(zip(names.values[::-1], positions))
 
-    # API请求数据
-    data = {
+
+# /api/repos 支持的排序维度
+SORT_DIMENSIONS = ['weighted_score', 'complexity_score', 'innovation_score', 'popularity_score']
+API_DEFAULT_LIMIT = 20
+API_MAX_LIMIT = 100
+
+
+def build_rank_orders(data):
+    """
+    为每个排序维度（及每个平台）预先计算按分数降序排列的行位置数组，分页时只需切片
+
+    Args:
+        data (DataFrame): 评分数据
+
+    Returns:
+        tuple: ({(维度, 平台或 None): 行位置数组}, {维度: 每行的名次数组})
+    """
+    platforms = data['platform'].astype(object).fillna('unknown').str.lower().to_numpy()
+    orders = {}
+    ranks = {}
+    for dimension in SORT_DIMENSIONS:
+        # 稳定排序，分数相同时保持原有顺序
+        order = np.argsort(-data[dimension].to_numpy(), kind='stable')
+        orders[(dimension, None)] = order
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(1, len(order) + 1)
+        ranks[dimension] = rank
+        for platform in np.unique(platforms):
+            orders[(dimension, platform)] = order[platforms[order] == platform]
+    return orders, ranks
+
+
+def build_column_arrays(data):
+    """
+    取出各列的底层数组，按行位置读取单个仓库时直接索引数组，不再用 iloc 构造整行 Series
+    （iloc 会为整行创建新对象并修改共享对象的引用计数，使 fork 出的 worker 复制数据页）
+
+    Args:
+        data (DataFrame): 评分数据
+
+    Returns:
+        dict: 列名 -> numpy 数组；分类列为 (编码数组, 取值数组)
+    """
+    columns = {}
+    for name in data.columns:
+        column = data[name]
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = (column.cat.codes.to_numpy(), column.cat.categories.to_numpy())
+        else:
+            columns[name] = column.to_numpy()
+    return columns
+
+
+def cell(column, position):
+    """读取某一行某一列的值，分类列的缺失值返回 None"""
+    values = total_columns[column]
+    if isinstance(values, tuple):
+        codes, categories = values
+        code = codes[position]
+        return categories[code] if code >= 0 else None
+    return values[position]
+
+
+def load_data():
+    """加载服务数据，并重建排行快照、仓库索引、排序数组与列数组"""
+    global data_version, total_data, readme_store, ranking_snapshot, total_index, rank_orders, ranks, \
+        total_columns
+
+    # 加载预先构建的服务数据（评分、来源与 mmap 打开的 README 存储）
+    serving_data = load_serving_data()
+    data_version = serving_data['version']
+    total_data = serving_data['total_data']
+    readme_store = serving_data['readme_store']
+    ranking_snapshot = build_ranking_snapshot(total_data)
+
+    # 仓库名 -> 行位置索引，每次重新加载数据时一并重建
+    total_index = build_repo_index(total_data['repo_name'])
+
+    # 各维度的预排序数组，供 /api/repos 分页使用
+    rank_orders, ranks = build_rank_orders(total_data)
+
+    # 按行位置读取单个仓库时使用的列数组
+    total_columns = build_column_arrays(total_data)
+
+
+load_data()
+
+# 确保词云图片的保存目录存在
+if not os.path.exists(WORDCLOUD_DIR):
+    os.makedirs(WORDCLOUD_DIR)
+
+# 大模型响应缓存（本地 SQLite）
+llm_cache = LLMResponseCache()
+
+# 云端大模型API配置
+LLM_API_URL = os.getenv("CLOUD_LLM_API_URL", "https://chat.ecnu.edu.cn/open/api/v1/chat/completions")
+LLM_API_KEY = os.getenv("CLOUD_LLM_API_KEY", "xxx")  # 实际使用时替换为您的API密钥
+LLM_MAX_CONCURRENCY = int(os.getenv("CLOUD_LLM_MAX_CONCURRENCY", 8))  # 同时进行的上游调用上限
+LLM_UNAVAILABLE = "分析服务暂时不可用，请稍后再试。"
+
+# 复用连接并带熔断的大模型客户端
+llm_client = LLMClient(LLM_API_URL, LLM_API_KEY, timeout=15, max_concurrency=LLM_MAX_CONCURRENCY)
+
+# 大模型后台分析任务队列：任务失败时记录到共享缓存，其他 worker 的状态查询也能看到
+llm_jobs = AnalysisJobQueue(on_failed=llm_cache.mark_failed, failure_text=LLM_UNAVAILABLE)
+
+
+def build_llm_payload(prompt, max_tokens=300):
+    """构建大模型API请求数据"""
+    return {
         "model": "ecnu-plus",  # 直接明确指定使用ecnu-plus模型
         "messages": [
             {
@@ -101,80 +199,216 @@ def call_cloud_llm(prompt, max_tokens=300, retry=3):
         "top_p": 0.9
     }
 
-    # 重试机制
-    for attempt in range(retry):
-        try:
-            response = requests.post(
-                api_url,
-                headers=headers,
-                json=data,
-                timeout=15
-            )
 
-            if response.status_code == 200:
-                result = response.json()
-                return result['choices'][0]['message']['content']
-            else:
-                print(f"API请求失败，尝试 {attempt + 1}/{retry}，状态码：{response.status_code}")
-                print(f"响应内容：{response.text}")
-                time.sleep(1)  # 失败后短暂延迟再重试
+# 云端大模型API调用函数
+def call_cloud_llm(prompt, max_tokens=300, retry=3, on_token=None, fallback=LLM_UNAVAILABLE):
+    """
+    调用云端大语言模型API
 
-        except Exception as e:
-            print(f"API调用异常 (尝试 {attempt + 1}/{retry})：{str(e)}")
-            time.sleep(2)  # 异常后稍长延迟再重试
+    Args:
+        prompt (str): 输入提示文本
+        max_tokens (int): 生成的最大token数
+        retry (int): 重试次数
+        on_token (callable): 流式回调，传入时以流式方式请求，每生成一段文本调用一次
+        fallback (str): 上游不可用时返回的文本，后台任务传入 None 以便区分失败
 
-    return "分析服务暂时不可用，请稍后再试。"
+    Returns:
+        str: 模型生成的文本
+    """
+    # API请求数据
+    data = build_llm_payload(prompt, max_tokens)
 
+    # 相同提示优先使用缓存，并发的相同请求只调用一次上游
+    result = llm_cache.get_or_call(data, lambda: llm_client.chat(data, retry=retry, on_token=on_token))
+    if result is None:
+        return fallback
+    return result
 
-@app.route('/')
-def index():
-    # 将前 100 个仓库发送到前端供用户选择
-    # 综合评分最高的 100 个仓库
-    top_100_repos = total_data.nlargest(100, 'weighted_score')
-    # 将数据分组，每组 20 个
-    grouped_repos = [top_100_repos[i:i + 20] for i in range(0, 100, 20)]
-    grouped_repos = [
-        group[['repo_name', 'weighted_score']].to_dict(orient='records') for group in grouped_repos
-    ]
-
-    # 获取来源链接数据
-    source_data = total_data[['platform', 'repo_name']]
-    source_data['source'] = source_data.apply(
-        lambda row: f"https://{row['platform']}.com/{row['repo_name']}" if pd.notna(row['platform']) else "未知", axis=1
-    )
-    source_links = source_data.set_index('repo_name')['source'].to_dict()
 
-    # 获取复杂性评分和创新性评分最高的前 10 名，用于柱状图
-    top_complexity = total_data.nlargest(10, 'complexity_score')[['repo_name', 'complexity_score']].to_dict(
-        orient='records')
-    top_innovation = total_data.nlargest(10, 'innovation_score')[['repo_name', 'innovation_score']].to_dict(
-        orient='records')
+def format_sse(event, data):
+    """格式化一条 Server-Sent Events 消息"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
 
-    # 将高分仓库列表用于下拉菜单选择
-    top_weighted_dropdown = top_100_repos[['repo_name', 'weighted_score']].head(10).to_dict(orient='records')
-    top_complexity_dropdown = total_data.nlargest(10, 'complexity_score')[['repo_name', 'complexity_score']].to_dict(
-        orient='records')
-    top_innovation_dropdown = total_data.nlargest(10, 'innovation_score')[['repo_name', 'innovation_score']].to_dict(
-        orient='records')
 
+@app.route('/')
+def index():
+    # 排行数据在加载时已计算好，这里只负责渲染
+    snapshot = ranking_snapshot
     return render_template(
         'index.html',
-        grouped_repos=grouped_repos,  # 分组后的 100 个仓库
-        source_links=source_links,  # 来源链接
-        top_complexity=top_complexity,  # 复杂性评分前 10 名
-        top_innovation=top_innovation,  # 创新性评分前 10 名
-        top_weighted_dropdown=top_weighted_dropdown,  # 综合评分前 10 名，用于下拉框
-        top_complexity_dropdown=top_complexity_dropdown,  # 复杂性评分前 10 名，用于下拉框
-        top_innovation_dropdown=top_innovation_dropdown  # 创新性评分前 10 名，用于下拉框
+        grouped_repos=snapshot.grouped_repos,  # 分组后的 100 个仓库
+        source_links=snapshot.source_links,  # 来源链接
+        top_complexity=snapshot.top_complexity,  # 复杂性评分前 10 名
+        top_innovation=snapshot.top_innovation,  # 创新性评分前 10 名
+        top_weighted_dropdown=snapshot.top_weighted_dropdown,  # 综合评分前 10 名，用于下拉框
+        top_complexity_dropdown=snapshot.top_complexity,  # 复杂性评分前 10 名，用于下拉框
+        top_innovation_dropdown=snapshot.top_innovation  # 创新性评分前 10 名，用于下拉框
     )
 
 
+def repo_record(position, with_ranks=False):
+    """根据行位置构建仓库的 JSON 记录"""
+    platform = cell('platform', position)
+    record = {
+        'repo_name': cell('repo_name', position),
+        'platform': platform if isinstance(platform, str) else None,
+        'source': cell('source', position),
+        'weighted_score': float(cell('weighted_score', position)),
+        'complexity_score': float(cell('complexity_score', position)),
+        'innovation_score': float(cell('innovation_score', position)),
+        'popularity_score': float(cell('popularity_score', position)),
+    }
+    if with_ranks:
+        record['ranks'] = {dimension: int(ranks[dimension][position]) for dimension in SORT_DIMENSIONS}
+    return record
+
+
+def api_response(payload, status=200):
+    """
+    构建 API 响应：带基于数据版本和请求参数的强 ETag，客户端可凭 If-None-Match 获得 304，
+    客户端支持时使用 gzip 压缩
+
+    Args:
+        payload (dict): 响应数据
+        status (int): HTTP 状态码
+
+    Returns:
+        Response: Flask 响应对象
+    """
+    gzip_accepted = 'gzip' in request.headers.get('Accept-Encoding', '')
+    digest = hashlib.sha256(request.full_path.encode('utf-8')).hexdigest()[:16]
+    # 压缩与未压缩的内容字节不同，强 ETag 需区分
+    etag = f"{data_version}-{digest}" + ("-gz" if gzip_accepted else "")
+
+    if status == 200 and request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        if gzip_accepted:
+            body = gzip.compress(body, compresslevel=6)
+        response = Response(body, status=status, mimetype='application/json')
+        if gzip_accepted:
+            response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if status in (200, 304):
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'  # 每次都向服务端验证 ETag
+    else:
+        response.headers['Cache-Control'] = 'no-store'  # 错误响应不缓存
+    return response
+
+
+def int_arg(name, default):
+    """读取整数查询参数：未提供时返回默认值，不是整数时返回 None"""
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+@app.route('/api/repos')
+def api_repos():
+    # 按维度排序、分页并可按平台过滤的仓库列表
+    sort = request.args.get('sort', 'weighted_score')
+    if sort not in SORT_DIMENSIONS:
+        return api_response({'error': f"sort 仅支持 {', '.join(SORT_DIMENSIONS)}"}, status=400)
+    order = request.args.get('order', 'desc')
+    if order not in ('asc', 'desc'):
+        return api_response({'error': "order 仅支持 asc 或 desc"}, status=400)
+    # 非整数或超出范围的参数返回 400，不回退到默认值（否则会返回并缓存客户端没有请求的页）
+    offset = int_arg('offset', 0)
+    limit = int_arg('limit', API_DEFAULT_LIMIT)
+    if offset is None or limit is None or offset < 0 or not 0 < limit <= API_MAX_LIMIT:
+        return api_response({'error': f"offset 需为非负整数，limit 需在 1 到 {API_MAX_LIMIT} 之间"}, status=400)
+    platform = request.args.get('platform')
+    platform = platform.lower() if platform else None
+
+    positions = rank_orders.get((sort, platform))
+    if positions is None:
+        positions = np.empty(0, dtype=np.int64)  # 没有该平台的仓库
+    if order == 'asc':
+        positions = positions[::-1]
+    page = positions[offset:offset + limit]
+
+    return api_response({
+        'data_version': data_version,
+        'sort': sort,
+        'order': order,
+        'platform': platform,
+        'offset': offset,
+        'limit': limit,
+        'total': int(len(positions)),
+        'repos': [repo_record(position) for position in page],
+    })
+
+
+@app.route('/api/repos/<path:repo_name>')
+def api_repo(repo_name):
+    # 单个仓库的各项评分与名次
+    position = total_index.get(repo_name)
+    if position is None:
+        return api_response({'error': f"未找到仓库 {repo_name}"}, status=404)
+    return api_response(dict(repo_record(position, with_ranks=True), data_version=data_version))
+
+
+@app.route('/llm/stats')
+def llm_stats():
+    # 大模型缓存命中率、上游调用延迟与错误计数
+    return jsonify({"cache": llm_cache.stats(), "client": llm_client.stats()})
+
+
+@app.route('/analyze/result/<job_id>')
+def analysis_job_result(job_id):
+    # 轮询接口：返回后台分析任务的当前进度
+    job = llm_jobs.get(job_id)
+    if job is not None:
+        return jsonify(job.snapshot())
+    # 任务可能由其他 worker 执行，完成后结果会写入共享缓存；状态查询不计入缓存命中统计
+    cached = llm_cache.get(job_id)
+    if cached is not None:
+        return jsonify({"job_id": job_id, "status": "done", "text": cached[0]})
+    failure = llm_cache.get_failure(job_id)
+    if failure is not None:
+        return jsonify({"job_id": job_id, "status": "failed", "text": failure})
+    return jsonify({"job_id": job_id, "status": "pending", "text": ""})
+
+
+@app.route('/analyze/stream/<job_id>')
+def analysis_stream(job_id):
+    # Server-Sent Events：随上游生成逐段推送分析结果
+    job = llm_jobs.get(job_id)
+
+    def events():
+        if job is not None:
+            for event, data in job.iter_events():
+                yield format_sse(event, data)
+            return
+        # 任务不在本进程中，等待其他 worker 把结果写入共享缓存
+        deadline = time.time() + 120
+        while time.time() < deadline:
+            cached = llm_cache.get(job_id)
+            if cached is not None:
+                yield format_sse("done", cached[0])
+                return
+            failure = llm_cache.get_failure(job_id)
+            if failure is not None:
+                yield format_sse("failed", failure)
+                return
+            time.sleep(1)
+        yield format_sse("timeout", None)
+
+    return Response(events(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+
 @app.route('/analyze', methods=['POST'])
 def analyze():
     repo_name = request.form['repo_name']
-    repo_data = total_data[total_data['repo_name'] == repo_name]
+    position = total_index.get(repo_name)
 
-    if repo_data.empty:
+    if position is None:
         return render_template('result.html', repo_name=repo_name,
                                repo_url="#", repo_source="未知",
                                analysis_result="未找到该仓库的数据，请检查仓库名称是否正确。",
@@ -186,45 +420,24 @@ def analyze():
                                optimization_suggestions="无优化建议。")
 
     # 获取评分数据
-    complexity = repo_data['complexity_score'].values[0]
-    innovation = repo_data['innovation_score'].values[0]
-    popularity = repo_data['popularity_score'].values[0]
+    complexity = cell('complexity_score', position)
+    innovation = cell('innovation_score', position)
+    popularity = cell('popularity_score', position)
     weighted_score = complexity + innovation - popularity
 
     # 获取来源信息
-    repo_source = repo_data['source'].values[0]
+    repo_source = cell('source', position)
     repo_url = repo_source
 
-    # 从 readme_data 中获取 README 内容
-    readme_content = readme_data[readme_data['repo'] == repo_name]['readme_text'].values
-    if len(readme_content) > 0 and isinstance(readme_content[0], str):
-        readme_content = readme_content[0]
-    elif len(readme_content) > 0:
-        readme_content = str(readme_content[0])  # 转换为字符串
-    else:
-        readme_content = "无内容"  # 如果内容为空或不是字符串，设置为默认值
+    # 从 README 存储中按需读取 README 内容
+    readme_content = readme_store.get_text(repo_name)
+    if readme_content is None:
+        readme_content = "无内容"  # 如果没有该仓库的 README，设置为默认值
 
-    # 生成词云
+    # 生成词云（按 README 内容和渲染参数缓存，重复访问直接复用图片）
     wordcloud_path = None
     if readme_content.strip():  # 确保内容非空
-        # 构建词云图片路径
-        wordcloud_path = f'static/wordclouds/{repo_name}.png'
-        wordcloud_dir = os.path.dirname(wordcloud_path)
-
-        # 创建父目录（如果不存在）
-        if not os.path.exists(wordcloud_dir):
-            os.makedirs(wordcloud_dir)
-
-        # 生成词云并保存
-        wordcloud = WordCloud(
-            width=800,
-            height=400,
-            background_color=None,  # 透明背景
-            mode="RGBA",
-            colormap="viridis",
-            #font_path="static/fonts/simhei.ttf"  # 指定支持中文的字体
-        ).generate(readme_content)
-        wordcloud.to_file(wordcloud_path)
+        wordcloud_path = get_wordcloud(readme_content)
 
     # 基于 README 分析冷门原因
     cold_reasons = []
@@ -264,11 +477,21 @@ def analyze():
         3. README改进建议：\n
     """
 
-    try:
-        # 调用云端大模型API替代本地模型
-        analysis_result = call_cloud_llm(prompt, max_tokens=500, retry=3)
-    except Exception as e:
-        analysis_result = f"生成失败：{e}"
+    # 缓存命中时直接展示结果，否则交给后台任务，页面随后通过轮询或 SSE 获取
+    analysis_job_id = llm_cache.make_key(build_llm_payload(prompt, max_tokens=500))
+    analysis_result = llm_cache.lookup(analysis_job_id)
+    if analysis_result is None:
+        # 清除上一次失败的记录，轮询方等待本次任务的结果
+        llm_cache.clear_failure(analysis_job_id)
+        job = llm_jobs.submit(
+            analysis_job_id,
+            lambda on_token: call_cloud_llm(prompt, max_tokens=500, retry=3, on_token=on_token, fallback=None)
+        )
+        if job is None:
+            analysis_job_id = None
+            analysis_result = "分析任务繁忙，请稍后再试。"
+    else:
+        analysis_job_id = None
 
     # 传递评分数据给前端，用于柱状图和饼状图
     scores = {
@@ -287,6 +510,7 @@ def analyze():
         popularity=popularity,
         wordcloud_path=wordcloud_path,
         analysis_result=analysis_result,
+        analysis_job_id=analysis_job_id,
         cold_reasons=" ".join(cold_reasons),
         optimization_suggestions=" ".join(optimization_suggestions),
         scores=scores  # 传递分数数据
@@ -0,0 +1,113 @@
+import os
+import sys
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from synthetic import ROOT
+
+"""
+采集吞吐量基准
+
+启动 crawler/mock_server.py，对同一批仓库接口分别测量每秒请求数：
+    threads  原实现：ThreadPoolExecutor（5 个线程），requests 同步请求，
+             每个请求后按 X-RateLimit-* 头固定 sleep(default_delay)
+    engine   当前实现：AsyncHttpEngine + gather_limited，按主机的令牌桶根据响应头限速
+同时统计被模拟服务器以 403 拒绝（超出配额）的请求数，令牌桶实现应始终为 0。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_crawler.py [--repos 5000] [--legacy-repos 100] [--latency 0.2] [--quota 100000] [--window 60]
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(latency, quota, window):
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT, MOCK_LATENCY=str(latency), MOCK_RATE_LIMIT=str(quota),
+               MOCK_RATE_WINDOW=str(window))
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'crawler', 'mock_server.py'), str(port)],
+                              env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("模拟服务器未能启动")
+
+
+def repo_urls(count):
+    return [f"https://api.github.com/repos/owner{i % 997}/repo-{i}" for i in range(count)]
+
+
+def run_threads(mock_url, urls, max_workers=5, default_delay=1):
+    """原 star_fork2.get_repo_data 的请求方式，返回 (耗时秒, 403 数)"""
+    import requests
+
+    def get(url):
+        response = requests.get(f"{mock_url}/api.github.com{url[len('https://api.github.com'):]}")
+        remaining = int(response.headers.get("X-RateLimit-Remaining", 0))
+        reset_time = int(response.headers.get("X-RateLimit-Reset", time.time()))
+        time.sleep(max(0, reset_time - time.time()) if remaining == 0 else default_delay)
+        return response.status_code
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        statuses = list(executor.map(get, urls))
+    return time.perf_counter() - start, statuses.count(403)
+
+
+def run_engine(urls, concurrency):
+    """当前实现，返回 (耗时秒, 403 数)"""
+    from crawler.engine import AsyncHttpEngine, gather_limited
+
+    async def crawl():
+        async with AsyncHttpEngine() as engine:
+            start = time.perf_counter()
+            async for _ in gather_limited(engine.request, urls, concurrency):
+                pass
+            elapsed = time.perf_counter() - start
+            rejected = sum(m.statuses.get(403, 0) for m in engine.metrics.hosts.values())
+        return elapsed, rejected
+
+    return asyncio.run(crawl())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="线程池 + sleep 与异步引擎的采集吞吐量对比")
+    parser.add_argument('--repos', type=int, default=5000, help="异步引擎请求的仓库数")
+    parser.add_argument('--legacy-repos', type=int, default=100, help="原实现请求的仓库数（约 5 请求/秒）")
+    parser.add_argument('--latency', type=float, default=0.2, help="模拟服务器每个请求的延迟（秒）")
+    parser.add_argument('--quota', type=int, default=100000, help="模拟服务器每个窗口的配额")
+    parser.add_argument('--window', type=int, default=60, help="配额窗口长度（秒）")
+    parser.add_argument('--concurrency', type=int, default=1000, help="异步引擎同时进行的请求数")
+    args = parser.parse_args()
+
+    server, mock_url = start_mock_server(args.latency, args.quota, args.window)
+    # 引擎在导入时读取 CRAWLER_MOCK_URL，指标文件写到临时目录，不覆盖仓库中的采集指标
+    os.environ['CRAWLER_MOCK_URL'] = mock_url
+    os.environ['CRAWLER_METRICS_FILE'] = os.path.join(tempfile.gettempdir(), 'bench_crawl_metrics.prom')
+    try:
+        results = [('threads', args.legacy_repos, *run_threads(mock_url, repo_urls(args.legacy_repos)))]
+        results.append(('engine', args.repos, *run_engine(repo_urls(args.repos), args.concurrency)))
+        print(f"模拟延迟 {args.latency}s，配额 {args.quota}/{args.window}s")
+        print(f"{'mode':>8} {'requests':>9} {'seconds':>8} {'req/s':>8} {'403':>5}")
+        for mode, count, seconds, rejected in results:
+            print(f"{mode:>8} {count:>9} {seconds:>8.1f} {count / seconds:>8.1f} {rejected:>5}")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    main()
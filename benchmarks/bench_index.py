@@ -0,0 +1,71 @@
+import time
+import argparse
+import statistics
+import pandas as pd
+from synthetic import synthetic_scores, parse_sizes
+import app
+
+"""
+首页 / 延迟基准
+
+对不同行数的合成评分表，分别测量：
+    snapshot  当前实现：数据加载时构建一次排行快照，GET / 只渲染模板
+    per-request  原实现：每次请求执行 5 次 nlargest，并逐行 apply 重建 source_links
+排行快照使首页延迟与仓库数无关，原实现随行数线性增长。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_index.py [--sizes 2500,10000,100000,1000000] [--requests 200]
+"""
+
+
+def legacy_index_context(data):
+    """原 index() 中每次请求执行的排行计算"""
+    top_100_repos = data.nlargest(100, 'weighted_score')
+    grouped_repos = [top_100_repos[i:i + 20] for i in range(0, 100, 20)]
+    grouped_repos = [group[['repo_name', 'weighted_score']].to_dict(orient='records') for group in grouped_repos]
+    source_data = data[['platform', 'repo_name']].copy()
+    source_data['source'] = source_data.apply(
+        lambda row: f"https://{row['platform']}.com/{row['repo_name']}" if pd.notna(row['platform']) else "未知", axis=1
+    )
+    source_links = source_data.set_index('repo_name')['source'].to_dict()
+    top_complexity = data.nlargest(10, 'complexity_score')[['repo_name', 'complexity_score']].to_dict(orient='records')
+    top_innovation = data.nlargest(10, 'innovation_score')[['repo_name', 'innovation_score']].to_dict(orient='records')
+    data.nlargest(10, 'complexity_score')[['repo_name', 'complexity_score']].to_dict(orient='records')
+    data.nlargest(10, 'innovation_score')[['repo_name', 'innovation_score']].to_dict(orient='records')
+    return grouped_repos, source_links, top_complexity, top_innovation
+
+
+def timed(func, repeat):
+    """重复执行 repeat 次，返回 (中位数, p95) 毫秒"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="首页 / 延迟随数据量变化的基准")
+    parser.add_argument('--sizes', default='2500,10000,100000,1000000', help="评分表行数，逗号分隔")
+    parser.add_argument('--requests', type=int, default=200, help="每个规模下 GET / 的次数")
+    parser.add_argument('--legacy-repeat', type=int, default=3, help="原实现每个规模下的执行次数（百万行时单次需数秒）")
+    args = parser.parse_args()
+
+    client = app.app.test_client()
+    print(f"{'rows':>9} {'build(ms)':>10} {'GET / p50':>10} {'GET / p95':>10} {'legacy p50':>11}")
+    for rows in parse_sizes(args.sizes):
+        data = synthetic_scores(rows)
+        start = time.perf_counter()
+        app.ranking_snapshot = app.build_ranking_snapshot(data)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        client.get('/')  # 预热模板缓存
+        p50, p95 = timed(lambda: client.get('/'), args.requests)
+        legacy_p50, _ = timed(lambda: legacy_index_context(data), args.legacy_repeat) if args.legacy_repeat else (0, 0)
+        print(f"{rows:>9} {build_ms:>10.1f} {p50:>10.2f} {p95:>10.2f} {legacy_p50:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
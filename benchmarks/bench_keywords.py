@@ -0,0 +1,103 @@
+import os
+import sys
+import time
+import random
+import argparse
+from synthetic import ROOT
+from nltk.corpus import stopwords
+from nltk.tokenize import word_tokenize
+from nltk.stem import WordNetLemmatizer
+
+sys.path.insert(0, os.path.join(ROOT, 'Score', 'inovation-point'))
+from keyword_matcher import LANGUAGE_KEYWORDS, KeywordMatcher, innovation_score
+
+"""
+创新关键词匹配基准
+
+生成合成 README 语料（英文、西班牙文、中文按比例混合），分别测量每个 README 的关键词统计耗时：
+    legacy   原 cre6.analyze_text：每次调用重新读取停用词表、新建词形还原器，
+             对每个关键词各做一次 list.count，中文按分词结果计数
+    matcher  当前实现：KeywordMatcher 在导入时构建关键词自动机，每个 README 只扫描一次
+两者都不含语言检测（langdetect 对两种实现相同）。同时输出各语言的平均得分，
+中文在原实现中分子按字符、分母按分词结果计数，得分会偏高数十倍。
+
+需要 NLTK 的 punkt_tab、stopwords、wordnet 数据（cre6.py 启动时会下载）。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_keywords.py [--readmes 10000] [--size 3000] [--mix en:6,es:2,zh:2]
+"""
+
+# 各语言的填充词，关键词按一定比例混入
+FILLER = {
+    "en": "the project provides a simple tool for building web services with python and docker support".split(),
+    "es": "el proyecto ofrece una herramienta sencilla para crear servicios web con python y docker".split(),
+    "zh": list("这是一个用于构建网络服务的简单工具支持容器部署与自动测试的开源项目"),
+}
+
+
+def make_readme(rng, language, size):
+    """生成约 size 个字符、约 2% 为关键词的 README"""
+    keywords = LANGUAGE_KEYWORDS[language]
+    separator = "" if language == "zh" else " "
+    parts, length = [], 0
+    while length < size:
+        word = rng.choice(keywords) if rng.random() < 0.02 else rng.choice(FILLER[language])
+        parts.append(word)
+        length += len(word) + len(separator)
+    return separator.join(parts)
+
+
+def legacy_count(text, topics, language):
+    """原 analyze_text 去掉语言检测后的部分，返回 (关键词出现次数, 总词数)"""
+    all_text = text + " ".join(topics)
+    keywords = LANGUAGE_KEYWORDS.get(language, LANGUAGE_KEYWORDS["en"])
+    tokens = word_tokenize(all_text.lower())
+    stop_words = set(stopwords.words(language)) if language in stopwords.fileids() else set(stopwords.words('english'))
+    filtered_tokens = [token for token in tokens if token.isalpha() and token not in stop_words]
+    lemmatizer = WordNetLemmatizer()
+    lemmatized_tokens = [lemmatizer.lemmatize(token) for token in filtered_tokens]
+    keyword_count = sum([lemmatized_tokens.count(keyword) for keyword in keywords])
+    return keyword_count, len(lemmatized_tokens)
+
+
+def parse_mix(text):
+    """en:6,es:2,zh:2 -> [(语言, 权重)]"""
+    return [(language, int(weight)) for language, weight in (item.split(':') for item in text.split(','))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="原关键词统计与 KeywordMatcher 的耗时对比")
+    parser.add_argument('--readmes', type=int, default=10000, help="README 数量")
+    parser.add_argument('--size', type=int, default=3000, help="README 平均字符数")
+    parser.add_argument('--mix', default='en:6,es:2,zh:2', help="各语言的比例")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    languages, weights = zip(*parse_mix(args.mix))
+    corpus = []
+    for language in rng.choices(languages, weights, k=args.readmes):
+        corpus.append((language, make_readme(rng, language, int(rng.uniform(0.5, 1.5) * args.size))))
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    results = {}
+    for mode, count in (('legacy', lambda text, language: legacy_count(text, [], language)),
+                        ('matcher', matcher.count)):
+        scores = {language: [] for language in languages}
+        start = time.perf_counter()
+        for language, text in corpus:
+            scores[language].append(innovation_score(*count(text, language)))
+        results[mode] = (time.perf_counter() - start, scores)
+
+    print(f"{args.readmes} 个 README，平均 {args.size} 字符，KeywordMatcher 构建 {build_ms:.0f} ms")
+    print(f"{'mode':>8} {'total(s)':>9} {'per README(ms)':>15} " + " ".join(f"{'score ' + l:>10}" for l in languages))
+    for mode, (seconds, scores) in results.items():
+        means = " ".join(f"{sum(s) / max(len(s), 1):>10.1f}" for s in scores.values())
+        print(f"{mode:>8} {seconds:>9.2f} {seconds / args.readmes * 1000:>15.3f} {means}")
+    print(f"加速 {results['legacy'][0] / results['matcher'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import time
+import random
+import argparse
+import pandas as pd
+from synthetic import synthetic_scores, parse_sizes
+import app
+
+"""
+/analyze 仓库查找基准
+
+原实现每次请求对评分表和 README 表各做一次布尔掩码扫描（逐个比较仓库名），
+当前实现在数据加载时构建 仓库名 -> 行位置 的字典与各列的数组，查找只需一次哈希探测，再按位置读取所需的列。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_lookup.py [--sizes 10000,100000,1000000] [--lookups 200]
+"""
+
+
+def mask_lookup(total_data, readme_data, repo_name):
+    """原 analyze() 的查找方式"""
+    repo_data = total_data[total_data['repo_name'] == repo_name]
+    readme_row = readme_data[readme_data['repo'] == repo_name]
+    return repo_data.iloc[0], readme_row['readme_text'].values[0]
+
+
+def index_lookup(index, readmes, repo_name):
+    """当前实现：字典查找行位置，从列数组读取各列，README 按仓库名从存储中读取"""
+    position = index.get(repo_name)
+    return {column: app.cell(column, position) for column in app.total_columns}, readmes.get(repo_name)
+
+
+def per_lookup_us(func, names):
+    start = time.perf_counter()
+    for name in names:
+        func(name)
+    return (time.perf_counter() - start) / len(names) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="掩码扫描与仓库索引的查找耗时对比")
+    parser.add_argument('--sizes', default='10000,100000,1000000', help="仓库数，逗号分隔")
+    parser.add_argument('--lookups', type=int, default=200, help="每个规模下的查找次数")
+    args = parser.parse_args()
+
+    print(f"{'repos':>9} {'index build(ms)':>16} {'mask(us)':>12} {'index(us)':>10} {'speedup':>9}")
+    for rows in parse_sizes(args.sizes):
+        total_data = synthetic_scores(rows)
+        readme_data = pd.DataFrame({'repo': total_data['repo_name'], 'readme_text': "# README\n" * 20})
+        names = random.Random(0).choices(list(total_data['repo_name']), k=args.lookups)
+
+        start = time.perf_counter()
+        index = app.build_repo_index(total_data['repo_name'])
+        app.total_columns = app.build_column_arrays(total_data)
+        readmes = dict(zip(readme_data['repo'], readme_data['readme_text']))  # 代替 README 存储的索引
+        build_ms = (time.perf_counter() - start) * 1000
+
+        mask_us = per_lookup_us(lambda name: mask_lookup(total_data, readme_data, name), names)
+        index_us = per_lookup_us(lambda name: index_lookup(index, readmes, name), names)
+        print(f"{rows:>9} {build_ms:>16.1f} {mask_us:>12.1f} {index_us:>10.1f} {mask_us / index_us:>8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
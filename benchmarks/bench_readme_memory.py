@@ -0,0 +1,99 @@
+import os
+import sys
+import csv
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from synthetic import ROOT
+import readme_store
+
+"""
+README 存储内存基准
+
+生成指定数量的合成 README（repo_readme_contents.csv 格式），分别在新进程中测量：
+    pandas  原实现：把整个 CSV 读入 pandas 的 object 列
+    store   当前实现：mmap 打开 README 存储并随机读取一部分 README
+RSS 分为匿名内存（进程私有）与文件映射（页缓存，多个 worker 共享同一份）两部分。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_readme_memory.py [--readmes 100000] [--size 4000] [--reads 1000]
+"""
+
+WORDS = ("install usage example config server client data model api docs build test "
+         "release license contributing feature support python java go rust web").split()
+
+# 在新进程中加载 README，输出加载前后的内存（kB）
+PROBE = """
+import sys, random
+
+def memory():
+    fields = {}
+    with open('/proc/self/status') as f:
+        for line in f:
+            key, _, value = line.partition(':')
+            fields[key] = int(value.split()[0]) if value.strip().endswith('kB') else 0
+    return fields['VmRSS'], fields.get('RssAnon', 0), fields.get('RssFile', 0)
+
+mode, path, reads = sys.argv[1], sys.argv[2], int(sys.argv[3])
+import pandas as pd
+import readme_store
+before = memory()
+if mode == 'pandas':
+    data = pd.read_csv(path, encoding='utf-8')
+    data['repo'] = data['repo'].astype(str)
+    sample = random.Random(0).sample(range(len(data)), min(reads, len(data)))
+    total = sum(len(data['readme_text'].iat[i]) for i in sample)
+else:
+    store = readme_store.ReadmeStore(path)
+    repos = random.Random(0).sample(list(store), min(reads, len(store)))
+    total = sum(len(store.get_text(repo)) for repo in repos)
+after = memory()
+print("PROBE", *(a - b for a, b in zip(after, before)))
+"""
+
+
+def write_corpus(path, count, size):
+    """生成 count 个平均约 size 字节的 README"""
+    rng = random.Random(0)
+    with open(path, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['repo', 'readme_text'])
+        for i in range(count):
+            words = rng.choices(WORDS, k=max(1, int(rng.uniform(0.5, 1.5) * size / 6)))
+            writer.writerow([f"owner{i % 997}/repo-{i}", f"# repo-{i}\n\n" + " ".join(words)])
+
+
+def probe(mode, path, reads):
+    output = subprocess.run([sys.executable, '-c', PROBE, mode, path, str(reads)], check=True,
+                            capture_output=True, text=True, env=dict(os.environ, PYTHONPATH=ROOT)).stdout
+    line = next(line for line in output.splitlines() if line.startswith('PROBE'))
+    return [int(value) / 1024 for value in line.split()[1:]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="pandas 列与 mmap README 存储的内存对比")
+    parser.add_argument('--readmes', type=int, default=100000, help="README 数量")
+    parser.add_argument('--size', type=int, default=4000, help="README 平均字节数")
+    parser.add_argument('--reads', type=int, default=1000, help="随机读取的 README 数")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='bench_readme_')
+    try:
+        csv_path = os.path.join(workdir, 'repo_readme_contents.csv')
+        prefix = os.path.join(workdir, 'readme_store')
+        write_corpus(csv_path, args.readmes, args.size)
+        readme_store.build_from_csv(csv_path, prefix)
+        print(f"{args.readmes} 个 README，CSV {os.path.getsize(csv_path) / 1024 / 1024:.0f} MB，"
+              f"存储 {os.path.getsize(readme_store.data_path(prefix)) / 1024 / 1024:.0f} MB，随机读取 {args.reads} 个")
+        print(f"{'mode':>7} {'RSS(MB)':>9} {'anon(MB)':>9} {'file(MB)':>9}")
+        for mode, path in (('pandas', csv_path), ('store', prefix)):
+            rss, anon, file_backed = probe(mode, path, args.reads)
+            print(f"{mode:>7} {rss:>9.1f} {anon:>9.1f} {file_backed:>9.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+from synthetic import ROOT, synthetic_scores, parse_sizes
+
+"""
+app.py 冷启动基准
+
+在临时目录中生成不同行数的 screen_data/*.csv，分别测量新进程 import app 的耗时：
+    artifact  先运行 serving_data.py 构建服务数据，启动时只读取 pickle
+    csv       没有服务数据，启动时回退到解析 CSV
+同时检查启动后是否导入了 matplotlib / wordcloud。
+
+--check 模式检查仓库自身的数据：服务数据缺失或过期（启动会回退到 CSV）、导入了重量级模块、
+或启动耗时超过 --max-seconds 时以非零状态退出，可用于部署前的回归检查。
+
+使用方法（在仓库根目录下运行）：
+    python benchmarks/bench_startup.py [--sizes 2500,100000,1000000] [--runs 3]
+    python benchmarks/bench_startup.py --check --max-seconds 2
+"""
+
+# 在新进程中导入 app，输出耗时、是否回退到 CSV 以及重量级模块是否被导入
+PROBE = """
+import sys, time, serving_data
+stale = serving_data.is_stale()
+start = time.perf_counter()
+import app
+print("PROBE", time.perf_counter() - start, int(stale),
+      int('matplotlib' in sys.modules), int('wordcloud' in sys.modules))
+"""
+
+
+def probe(cwd):
+    """在 cwd 下启动一个新进程导入 app，返回 (耗时秒, 是否回退到 CSV, 是否导入了重量级模块)"""
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=cwd, env=env, check=True,
+                            capture_output=True, text=True).stdout
+    line = next(line for line in output.splitlines() if line.startswith('PROBE'))
+    _, seconds, stale, matplotlib_loaded, wordcloud_loaded = line.split()
+    return float(seconds), stale == '1', matplotlib_loaded == '1' or wordcloud_loaded == '1'
+
+
+def median_probe(cwd, runs):
+    results = [probe(cwd) for _ in range(runs)]
+    return statistics.median(r[0] for r in results), results[0][1], any(r[2] for r in results)
+
+
+def make_workdir(rows):
+    """生成含合成 screen_data 的临时工作目录（模板与静态文件链接到仓库中的目录）"""
+    workdir = tempfile.mkdtemp(prefix='bench_startup_')
+    os.makedirs(os.path.join(workdir, 'screen_data'))
+    os.makedirs(os.path.join(workdir, 'static'))
+    data = synthetic_scores(rows)
+    data[['repo_name', 'complexity_score', 'innovation_score', 'popularity_score']].to_csv(
+        os.path.join(workdir, 'screen_data', 'total.csv'), index=False)
+    data[['platform', 'repo_name']].to_csv(os.path.join(workdir, 'screen_data', 'source.csv'), index=False)
+    os.symlink(os.path.join(ROOT, 'templates'), os.path.join(workdir, 'templates'))
+    return workdir
+
+
+def run_benchmark(sizes, runs):
+    print(f"{'rows':>9} {'csv fallback(s)':>16} {'artifact(s)':>12} {'heavy imports':>14}")
+    for rows in sizes:
+        workdir = make_workdir(rows)
+        try:
+            csv_seconds, _, _ = median_probe(workdir, runs)
+            subprocess.run([sys.executable, os.path.join(ROOT, 'serving_data.py')], cwd=workdir, check=True,
+                           capture_output=True, env=dict(os.environ, PYTHONPATH=ROOT))
+            artifact_seconds, stale, heavy = median_probe(workdir, runs)
+            note = " (服务数据未生效!)" if stale else ""
+            print(f"{rows:>9} {csv_seconds:>16.2f} {artifact_seconds:>12.2f} {'yes' if heavy else 'no':>14}{note}")
+        finally:
+            shutil.rmtree(workdir)
+
+
+def run_check(runs, max_seconds):
+    seconds, stale, heavy = median_probe(ROOT, runs)
+    problems = []
+    if stale:
+        problems.append("服务数据缺失或早于源 CSV，启动时回退到解析 CSV（请运行 python serving_data.py）")
+    if heavy:
+        problems.append("启动时导入了 matplotlib 或 wordcloud")
+    if max_seconds is not None and seconds > max_seconds:
+        problems.append(f"启动耗时 {seconds:.2f}s 超过 {max_seconds}s")
+    print(f"import app 耗时 {seconds:.2f}s")
+    for problem in problems:
+        print(f"失败: {problem}")
+    return 1 if problems else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py 冷启动耗时基准")
+    parser.add_argument('--sizes', default='2500,100000,1000000', help="合成数据的仓库数，逗号分隔")
+    parser.add_argument('--runs', type=int, default=3, help="每种情况启动的进程数（取中位数）")
+    parser.add_argument('--check', action='store_true', help="检查仓库自身数据的启动情况")
+    parser.add_argument('--max-seconds', type=float, help="--check 模式下允许的最长启动耗时")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(run_check(args.runs, args.max_seconds))
+    run_benchmark(parse_sizes(args.sizes), args.runs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import subprocess
+import urllib.request
+from synthetic import ROOT, synthetic_scores, parse_sizes
+
+"""
+gunicorn worker 内存基准
+
+用合成评分表构建服务数据，按不同 worker 数启动 gunicorn（使用仓库的 gunicorn.conf.py），
+先向各 worker 发送一批 /api/repos 与 / 请求，再从 /proc/<pid>/smaps_rollup 读取主进程与各 worker 的：
+    RSS  常驻内存（共享页在每个进程中都会计入）
+    PSS  按共享进程数分摊后的内存，全部进程相加即实际占用
+    USS  进程私有的内存（Private_Clean + Private_Dirty），即每增加一个 worker 的边际内存
+--no-preload 另外以关闭 preload_app 的配置运行一遍作为对照。
+
+使用方法（在仓库根目录下运行，需要安装 gunicorn）：
+    python benchmarks/bench_worker_rss.py [--workers 1,4,16] [--rows 200000] [--requests 400] [--no-preload]
+"""
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def smaps_rollup(pid):
+    """读取进程的内存统计（MB）"""
+    fields = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == 'kB':
+                fields[parts[0].rstrip(':')] = int(parts[1]) / 1024
+    return {
+        'rss': fields.get('Rss', 0),
+        'pss': fields.get('Pss', 0),
+        'uss': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+    }
+
+
+def children(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+
+def make_workdir(rows):
+    """生成合成数据的工作目录并构建服务数据"""
+    workdir = tempfile.mkdtemp(prefix='bench_rss_')
+    os.makedirs(os.path.join(workdir, 'screen_data'))
+    data = synthetic_scores(rows)
+    data[['repo_name', 'complexity_score', 'innovation_score', 'popularity_score']].to_csv(
+        os.path.join(workdir, 'screen_data', 'total.csv'), index=False)
+    data[['platform', 'repo_name']].to_csv(os.path.join(workdir, 'screen_data', 'source.csv'), index=False)
+    for name in ('templates', 'static'):
+        os.symlink(os.path.join(ROOT, name), os.path.join(workdir, name))
+    subprocess.run([sys.executable, os.path.join(ROOT, 'serving_data.py')], cwd=workdir, check=True,
+                   capture_output=True, env=dict(os.environ, PYTHONPATH=ROOT))
+    return workdir, list(data['repo_name'].sample(50, random_state=0))
+
+
+def write_config(workdir, preload):
+    """仓库的 gunicorn 配置，按需关闭 preload_app"""
+    path = os.path.join(workdir, 'bench_gunicorn.conf.py')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(f"exec(open({os.path.join(ROOT, 'gunicorn.conf.py')!r}, encoding='utf-8').read())\n")
+        f.write(f"preload_app = {preload!r}\n")
+    return path
+
+
+def measure(workdir, config, workers, names, requests):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', config, '-w', str(workers), '-b', f'127.0.0.1:{port}',
+         '--log-level', 'warning', 'app:app'],
+        cwd=workdir, env=dict(os.environ, PYTHONPATH=ROOT), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        base = f'http://127.0.0.1:{port}'
+        deadline = time.time() + 300
+        while True:
+            try:
+                urllib.request.urlopen(base + '/api/repos?limit=1', timeout=5).read()
+                break
+            except OSError:
+                if time.time() > deadline or server.poll() is not None:
+                    raise RuntimeError("gunicorn 未能启动")
+                time.sleep(0.5)
+        while len(children(server.pid)) < workers and time.time() < deadline:
+            time.sleep(0.5)
+
+        # 请求分散到各 worker：分页列表、单个仓库与首页
+        for i in range(requests):
+            path = ['/api/repos?limit=100&offset=%d' % (i * 100), f'/api/repos/{names[i % len(names)]}', '/'][i % 3]
+            urllib.request.urlopen(base + path, timeout=30).read()
+
+        master = smaps_rollup(server.pid)
+        worker_stats = [smaps_rollup(pid) for pid in children(server.pid)]
+        return master, worker_stats
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="gunicorn 各 worker 数下的内存占用")
+    parser.add_argument('--workers', default='1,4,16', help="worker 数，逗号分隔")
+    parser.add_argument('--rows', type=int, default=200000, help="合成评分表的仓库数")
+    parser.add_argument('--requests', type=int, default=400, help="测量前发送的请求数")
+    parser.add_argument('--no-preload', action='store_true', help="另外测量关闭 preload_app 的情况作为对照")
+    args = parser.parse_args()
+
+    workdir, names = make_workdir(args.rows)
+    try:
+        modes = [True, False] if args.no_preload else [True]
+        print(f"{args.rows} 个仓库；单位 MB")
+        print(f"{'preload':>8} {'workers':>8} {'master RSS':>11} {'worker RSS':>11} {'worker USS':>11} "
+              f"{'total PSS':>10} {'PSS/worker':>11}")
+        for preload in modes:
+            config = write_config(workdir, preload)
+            for workers in parse_sizes(args.workers):
+                master, worker_stats = measure(workdir, config, workers, names, args.requests)
+                count = max(len(worker_stats), 1)
+                total_pss = master['pss'] + sum(w['pss'] for w in worker_stats)
+                print(f"{str(preload):>8} {workers:>8} {master['rss']:>11.1f} "
+                      f"{sum(w['rss'] for w in worker_stats) / count:>11.1f} "
+                      f"{sum(w['uss'] for w in worker_stats) / count:>11.1f} "
+                      f"{total_pss:>10.1f} {total_pss / count:>11.1f}")
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import os
+import sys
+import numpy as np
+import pandas as pd
+
+"""
+基准测试用的合成数据
+
+按 screen_data/total.csv 与 source.csv 的列生成任意行数的评分表，仓库名唯一，分数随机。
+各基准脚本从仓库根目录导入 app、serving_data 等模块，这里统一设置模块路径与工作目录。
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)  # app.py 与 serving_data.py 使用相对于仓库根目录的数据路径
+
+PLATFORMS = ['github', 'gitee']
+
+
+def synthetic_scores(rows, seed=0):
+    """
+    生成与 serving_data.load_total_data 输出相同列的评分表
+
+    Args:
+        rows (int): 仓库数
+        seed (int): 随机种子
+
+    Returns:
+        DataFrame: repo_name、各项分数、weighted_score、platform、source
+    """
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'repo_name': [f"owner{i % 997}/repo-{i}" for i in range(rows)],
+        'complexity_score': rng.random(rows) * 100,
+        'innovation_score': rng.random(rows) * 100,
+        'popularity_score': rng.random(rows) * 100,
+    })
+    data['weighted_score'] = data['complexity_score'] + data['innovation_score'] - data['popularity_score']
+    data['platform'] = np.array(PLATFORMS, dtype=object)[rng.integers(0, len(PLATFORMS), rows)]
+    data['source'] = 'https://' + data['platform'] + '.com/' + data['repo_name']
+    return data
+
+
+def parse_sizes(text):
+    """解析 2500,10000,1e6 形式的行数列表"""
+    return [int(float(size)) for size in text.split(',')]
@@ -0,0 +1,3 @@
+"""
+数据采集公共模块，供 Sample_Data、Score 下的各采集脚本共用
+"""
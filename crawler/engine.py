@@ -0,0 +1,365 @@
+import os
+import json
+import time
+import random
+import asyncio
+import email.utils
+from datetime import timezone
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+import aiohttp
+from aiohttp import web
+from crawler.tokens import PLATFORM_HOSTS, request_resource
+from crawler.metrics import CrawlMetrics, METRICS_FILE, METRICS_PORT
+
+"""
+异步 HTTP 采集引擎
+
+所有采集脚本共用一个 aiohttp 会话：每个主机有独立的连接池上限，
+每个主机一个令牌桶，根据响应头 X-RateLimit-Remaining / X-RateLimit-Reset 调整补充速率，
+把剩余配额均匀分摊到重置前的时间窗口内，并扣除仍在途中的请求，保证不会超出配额；
+配额耗尽（403/429）时整个主机暂停到重置时间，5xx 与网络错误按指数退避重试。
+
+传入 TokenPool 时，GitHub / Gitee 接口的每个请求由令牌池分配 Token，令牌桶按 (主机, Token) 区分，
+各 Token 的配额分别限速。
+每个请求的耗时、状态码、重试、等待时间与字节数记录到 CrawlMetrics（见 crawler/metrics.py），
+采集过程中定期写入指标文件，结束时打印各主机汇总。
+传入 HttpCache 时，GET 请求带上 ETag / Last-Modified 做条件请求，304 时使用本地保存的响应体；
+缓存的 SQLite 读写在单独的线程中依次执行，不阻塞事件循环。
+
+设置环境变量 CRAWLER_MOCK_URL（如 http://127.0.0.1:8080）后，所有请求改发到本地模拟服务器，
+路径为 /<原主机名>/<原路径>，用于在不消耗真实配额的情况下测试吞吐量。
+"""
+
+TIMEOUT = 30  # 请求超时（秒）
+RETRY_TIMES = 5  # 失败重试次数
+MAX_CONNECTIONS_PER_HOST = 50  # 每个主机的连接池上限
+DEFAULT_RATE = 20.0  # 未收到速率限制头的主机，每秒请求数
+MAX_BURST = 100  # 令牌桶容量上限
+MOCK_URL = os.getenv("CRAWLER_MOCK_URL")
+METRICS_INTERVAL = 30  # 指标文件写入间隔（秒）
+DEFAULT_RETRY_AFTER = 60  # 无法解析 Retry-After 时的暂停时间（秒）
+# 重试也不会成功的状态码：不存在（404）、仓库为空（409）、已删除（410）、因法律原因不可用（451）
+PERMANENT_STATUSES = (404, 409, 410, 451)
+
+FetchResult = namedtuple('FetchResult', ['status', 'headers', 'body'])
+
+
+class PermanentError(Exception):
+    """资源永久不可用（见 PERMANENT_STATUSES），重试也不会成功"""
+
+    def __init__(self, url, status):
+        super().__init__(f"状态码 {status}: {url}")
+        self.url = url
+        self.status = status
+
+
+def result_json(result):
+    """解析响应体 JSON"""
+    return json.loads(result.body)
+
+
+def result_text(result):
+    """以 UTF-8 解码响应体"""
+    return result.body.decode('utf-8', errors='replace')
+
+
+def retry_after_seconds(value):
+    """解析 Retry-After 头（秒数或 HTTP 日期），返回需要等待的秒数，无法解析时返回 None"""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)  # HTTP 日期总是 GMT
+    return max(0.0, when.timestamp() - time.time())
+
+
+class TokenBucket:
+    """单个主机的令牌桶"""
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=MAX_BURST):
+        self.rate = rate  # 每秒补充的令牌数
+        self.capacity = capacity
+        self.tokens = capacity
+        self.inflight = 0  # 已取得令牌但尚未收到响应的请求数
+        self.paused_until = 0  # 配额耗尽时暂停到的时间点（monotonic）
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        """取得一个令牌，令牌不足时等待"""
+        async with self._lock:  # 等待者按先来后到依次取得令牌
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.inflight += 1
+                    return
+                # 最多睡 1 秒后重新检查，期间收到的响应头可能已调整速率
+                await asyncio.sleep(min(1.0, (1 - self.tokens) / self.rate))
+
+    def release(self):
+        self.inflight -= 1
+
+    def pause(self, seconds):
+        """暂停该主机的请求"""
+        self.tokens = 0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def update(self, headers):
+        """根据响应头中的剩余配额与重置时间调整令牌桶"""
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        try:
+            remaining = int(remaining)
+            window = max(1.0, float(reset) - time.time())
+        except ValueError:
+            return
+        self._refill()
+        if remaining == 0:
+            self.pause(window)
+            return
+        # 剩余配额中扣除仍在途中的请求，再均匀分摊到重置前的时间窗口
+        available = max(0, remaining - self.inflight)
+        self.rate = max(available, 1) / window
+        self.capacity = max(1, min(available, MAX_BURST))
+        self.tokens = min(self.tokens, available)
+
+
+class AsyncHttpEngine:
+    def __init__(self, max_connections_per_host=MAX_CONNECTIONS_PER_HOST, timeout=TIMEOUT,
+                 retries=RETRY_TIMES, default_rate=DEFAULT_RATE, cache=None, tokens=None, metrics=None):
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.retries = retries
+        self.default_rate = default_rate
+        self.cache = cache  # HttpCache，None 表示不使用条件请求缓存
+        self.tokens = tokens  # TokenPool，None 表示使用调用方请求头中的认证信息
+        self.metrics = metrics or CrawlMetrics()
+        self.session = None
+        self._buckets = {}
+        self._metrics_task = None
+        self._metrics_runner = None
+        self._cache_executor = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=0, limit_per_host=self.max_connections_per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector, timeout=aiohttp.ClientTimeout(total=self.timeout))
+        self._metrics_task = asyncio.ensure_future(self._write_metrics_periodically())
+        if self.cache is not None:
+            # 单个线程依次执行缓存读写，SQLite 写入之间不会争用锁
+            self._cache_executor = ThreadPoolExecutor(1, thread_name_prefix='http-cache')
+        if METRICS_PORT:
+            await self._serve_metrics(int(METRICS_PORT))
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.session.close()
+        self._metrics_task.cancel()
+        if self._cache_executor is not None:
+            self._cache_executor.shutdown(wait=True)
+        if self._metrics_runner is not None:
+            await self._metrics_runner.cleanup()
+        self.metrics.write(METRICS_FILE)
+        for line in self.metrics.summary():
+            print(line)
+        print(f"采集指标已写入 {METRICS_FILE}")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            print(f"HTTP 缓存：304 重新验证 {stats['revalidated']} 次，新写入 {stats['stored']} 条，"
+                  f"无法缓存 {stats['uncacheable']} 条")
+        if self.tokens is not None:
+            for line in self.tokens.report():
+                print(f"配额使用 {line}")
+
+    async def _write_metrics_periodically(self):
+        while True:
+            await asyncio.sleep(METRICS_INTERVAL)
+            self.metrics.write(METRICS_FILE)
+
+    async def _serve_metrics(self, port):
+        """在本机端口提供 Prometheus 格式的 /metrics 接口"""
+        async def handle(request):
+            return web.Response(text=self.metrics.prometheus_text(), content_type='text/plain')
+
+        app = web.Application()
+        app.router.add_get('/metrics', handle)
+        self._metrics_runner = web.AppRunner(app)
+        await self._metrics_runner.setup()
+        await web.TCPSite(self._metrics_runner, '127.0.0.1', port).start()
+        print(f"采集指标接口: http://127.0.0.1:{port}/metrics")
+
+    async def _backoff(self, host, attempt):
+        """指数退避等待，计入重试与等待时间"""
+        delay = 2 ** attempt + random.random()
+        self.metrics.observe_retry(host)
+        self.metrics.observe_wait(host, 'backoff', delay)
+        await asyncio.sleep(delay)
+
+    async def _cache_call(self, func, *args):
+        """在缓存线程中执行 HttpCache 的方法"""
+        return await asyncio.get_running_loop().run_in_executor(self._cache_executor, func, *args)
+
+    def bucket(self, host, token=None, resource='core'):
+        """主机（及 Token、配额类别）对应的令牌桶"""
+        key = (host, token.value if token is not None else None, resource)
+        if key not in self._buckets:
+            self._buckets[key] = TokenBucket(rate=self.default_rate)
+        return self._buckets[key]
+
+    @staticmethod
+    def _target(url):
+        """返回实际请求的 URL（模拟服务器模式下改写到本地）"""
+        if not MOCK_URL:
+            return url
+        parts = urlsplit(url)
+        return f"{MOCK_URL.rstrip('/')}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+    async def request(self, url, headers=None, method='GET', **kwargs):
+        """
+        发送请求，遵守主机令牌桶，速率限制与服务端错误时自动重试
+
+        Args:
+            url (str): 请求地址
+            headers (dict): 请求头
+            method (str): 请求方法
+
+        Returns:
+            FetchResult: 响应（状态码、响应头、响应体），多次重试仍失败时返回 None
+        """
+        parts = urlsplit(url)
+        host = parts.netloc
+        platform = PLATFORM_HOSTS.get(host)
+        resource = request_resource(parts.path)
+        use_pool = self.tokens is not None and self.tokens.has(platform)
+        cache_key = entry = None
+        if self.cache is not None and method == 'GET':
+            cache_key = self.cache.make_key(url, headers)
+            entry = await self._cache_call(self.cache.get, cache_key)
+            headers = {**(headers or {}), **self.cache.conditional_headers(entry)}
+        attempt = 0
+        while attempt < self.retries:
+            # 每次尝试重新选择 Token，配额耗尽的 Token 会被换掉
+            waited = time.monotonic()
+            token = await self.tokens.acquire(platform, resource) if use_pool else None
+            request_headers = {**(headers or {}), **token.auth_headers()} if token is not None else headers
+            self.metrics.observe_wait(host, 'token_pool', time.monotonic() - waited)
+            bucket = self.bucket(host, token, resource)
+            waited = time.monotonic()
+            await bucket.acquire()
+            started = time.monotonic()
+            self.metrics.observe_wait(host, 'rate_limit', started - waited)
+            try:
+                async with self.session.request(method, self._target(url), headers=request_headers,
+                                                **kwargs) as response:
+                    body = await response.read()
+                    result = FetchResult(response.status, response.headers, body)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                bucket.release()
+                if token is not None:
+                    self.tokens.release(token, resource)
+                self.metrics.observe_error(host, time.monotonic() - started)
+                print(f"请求失败 ({attempt + 1}/{self.retries}): {url} {e}")
+                await self._backoff(host, attempt)  # 指数退避重试
+                attempt += 1
+                continue
+            self.metrics.observe_response(host, result.status, time.monotonic() - started, len(body), result.headers)
+            bucket.release()
+            bucket.update(result.headers)
+            if token is not None:
+                self.tokens.release(token, resource)
+                self.tokens.update(token, result.headers, resource)
+
+            if result.status in (403, 429) and (
+                    result.headers.get('X-RateLimit-Remaining') == '0' or 'Retry-After' in result.headers):
+                # 配额耗尽：令牌桶已暂停到重置时间，Retry-After 则按服务端要求暂停；等待配额不计入重试次数
+                # 使用令牌池时，下一次尝试会换用其他仍有配额的 Token
+                if 'Retry-After' in result.headers:
+                    delay = retry_after_seconds(result.headers['Retry-After'])
+                    bucket.pause(DEFAULT_RETRY_AFTER if delay is None else delay)
+                print(f"速率限制，{host} 暂停请求: {url}")
+                self.metrics.observe_retry(host)
+                continue
+            if result.status >= 500:
+                print(f"服务端错误 {result.status} ({attempt + 1}/{self.retries}): {url}")
+                await self._backoff(host, attempt)
+                attempt += 1
+                continue
+            if cache_key is not None:
+                if result.status == 304 and entry is not None:
+                    # 资源未变化，使用本地保存的响应体
+                    await self._cache_call(self.cache.touch, cache_key)
+                    return FetchResult(200, entry[2], entry[3])
+                if result.status == 200:
+                    await self._cache_call(self.cache.store, cache_key, url, result.headers, result.body)
+            return result
+        return None
+
+    async def get_json(self, url, headers=None, raise_permanent=False):
+        """GET 请求并解析 JSON，非 200 响应返回 None；raise_permanent=True 时永久性错误抛出 PermanentError"""
+        result = await self.request(url, headers=headers)
+        if result is None or result.status != 200:
+            if result is not None and result.status == 404:
+                print(f"未找到 (404): {url}")
+            if raise_permanent and result is not None and result.status in PERMANENT_STATUSES:
+                raise PermanentError(url, result.status)
+            return None
+        return result_json(result)
+
+    async def get_text(self, url, headers=None):
+        """GET 请求并返回文本，非 200 响应返回空字符串"""
+        result = await self.request(url, headers=headers)
+        if result is None or result.status != 200:
+            return ""
+        return result_text(result)
+
+
+async def gather_limited(func, items, concurrency=1000):
+    """
+    对每个元素调用协程函数，同时运行的协程数不超过 concurrency，按完成顺序产出结果
+
+    Args:
+        func (callable): 协程函数，接收一个元素
+        items (iterable): 待处理的元素
+        concurrency (int): 同时运行的协程数上限
+
+    Yields:
+        结果或异常（异常不会中断其他任务）
+    """
+    async def run(item):
+        try:
+            return await func(item)
+        except Exception as e:
+            return e
+
+    # 只为正在运行的元素创建协程，避免一次性为全部仓库创建任务
+    items = iter(items)
+    pending = set()
+    while True:
+        for item in items:
+            pending.add(asyncio.ensure_future(run(item)))
+            if len(pending) >= concurrency:
+                break
+        if not pending:
+            return
+        done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            yield task.result()
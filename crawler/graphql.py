@@ -0,0 +1,204 @@
+import math
+import time
+import calendar
+import asyncio
+from urllib.parse import urlsplit
+from crawler.engine import gather_limited, result_json
+from crawler.metadata import parse_metadata
+
+"""
+GitHub GraphQL 批量采集
+
+把多个仓库合并到一个带别名的 GraphQL 查询中（r0: repository(...), r1: repository(...) ...），
+一次请求取回 stars、forks、topics、默认分支、最近推送时间，以及可选的 README 文本，
+替代每个仓库一到两次 REST 请求。
+
+批大小按查询代价调整：请求前按 GitHub 的规则估算代价，不超过剩余点数；
+响应中的 rateLimit 用于更新剩余点数，点数不足时暂停到重置时间；
+超时、5xx 或资源超限时批大小减半并拆分重试，连续成功后逐步增大。
+GraphQL 接口必须携带 Token（请求头或引擎的令牌池）。
+"""
+
+GRAPHQL_URL = "https://api.github.com/graphql"
+TOPICS_FIRST = 20  # 每个仓库取回的 topics 数量上限
+MAX_BATCH_SIZE = 100
+README_BATCH_SIZE = 25  # 带 README 时响应体较大，初始批大小更小
+BATCH_CONCURRENCY = 4  # 同时进行的批量查询数，GitHub 不建议对 GraphQL 大量并发
+NOT_FOUND = 'NOT_FOUND'  # 仓库不存在时的结果，与查询失败（None）区分，重试也不会成功
+
+REPO_FIELDS = """
+    stargazerCount
+    forkCount
+    pushedAt
+    defaultBranchRef { name }
+    repositoryTopics(first: %d) { nodes { topic { name } } }
+""" % TOPICS_FIRST
+
+README_FIELD = """
+    readme: object(expression: "HEAD:README.md") { ... on Blob { text } }
+"""
+
+
+def build_query(repos, with_readme=False):
+    """
+    构造带别名的多仓库查询，仓库名通过变量传入
+
+    Args:
+        repos (list): [(org, repo), ...]
+        with_readme (bool): 是否同时取回 README 文本
+
+    Returns:
+        tuple: (查询字符串, 变量 dict)
+    """
+    fields = REPO_FIELDS + (README_FIELD if with_readme else "")
+    params = []
+    selections = []
+    variables = {}
+    for i, (org, repo) in enumerate(repos):
+        params.append(f"$o{i}: String!, $n{i}: String!")
+        selections.append(f"r{i}: repository(owner: $o{i}, name: $n{i}) {{{fields}}}")
+        variables[f"o{i}"] = org
+        variables[f"n{i}"] = repo
+    query = ("query(" + ", ".join(params) + ") {\n"
+             "rateLimit { cost remaining resetAt }\n" + "\n".join(selections) + "\n}")
+    return query, variables
+
+
+def estimate_cost(batch_size):
+    """按 GitHub 的规则估算查询代价：连接请求数（每个仓库的 topics 连接）除以 100 向上取整，最少为 1"""
+    return max(1, math.ceil(batch_size / 100))
+
+
+def parse_repository(node):
+    """
+    把查询结果中的单个仓库转换为元数据与 README
+
+    Returns:
+        tuple: (元数据 dict（字段与 REST 接口一致），README 文本)
+    """
+    branch = node.get('defaultBranchRef') or {}
+    topics = [item['topic']['name'] for item in (node.get('repositoryTopics') or {}).get('nodes', [])]
+    metadata = parse_metadata({
+        'stargazers_count': node.get('stargazerCount', 0),
+        'forks_count': node.get('forkCount', 0),
+        'topics': topics,
+        'default_branch': branch.get('name'),
+        'pushed_at': node.get('pushedAt'),
+    })
+    readme = (node.get('readme') or {}).get('text') or ""
+    return metadata, readme
+
+
+class BatchFailed(Exception):
+    """批量查询失败（超时、5xx、资源超限），需要拆分重试"""
+
+
+class GraphQLBatcher:
+    def __init__(self, engine, headers, with_readme=False, batch_size=None, concurrency=BATCH_CONCURRENCY):
+        self.engine = engine
+        self.headers = headers
+        self.with_readme = with_readme
+        self.max_batch_size = batch_size or (README_BATCH_SIZE if with_readme else MAX_BATCH_SIZE)
+        self.batch_size = self.max_batch_size
+        self.concurrency = concurrency
+        self.remaining = None  # 剩余点数，收到第一个响应前未知
+        self._successes = 0
+
+    def _next_batch_size(self):
+        """当前批大小，不超过剩余点数允许的范围"""
+        size = self.batch_size
+        if self.remaining is not None:
+            size = min(size, max(1, self.remaining * 100))
+        return size
+
+    def _update_rate_limit(self, rate_limit):
+        if not rate_limit:
+            return
+        self.remaining = rate_limit['remaining']
+        if self.remaining < estimate_cost(self.batch_size):
+            self.remaining = None
+            if self.engine.tokens is not None and self.engine.tokens.has('github'):
+                return  # 使用令牌池时由令牌池根据响应头换用其他 Token
+            # 点数不足以再发一个批次，暂停 GraphQL 主机到重置时间
+            reset_at = calendar.timegm(time.strptime(rate_limit['resetAt'], "%Y-%m-%dT%H:%M:%SZ"))
+            print(f"GraphQL 点数不足，暂停到 {rate_limit['resetAt']}")
+            bucket = self.engine.bucket(urlsplit(GRAPHQL_URL).netloc, resource='graphql')
+            bucket.pause(max(1.0, reset_at - time.time()))
+
+    async def _query(self, repos):
+        query, variables = build_query(repos, self.with_readme)
+        result = await self.engine.request(GRAPHQL_URL, headers=self.headers, method='POST',
+                                           json={'query': query, 'variables': variables})
+        if result is None or result.status >= 500 or result.status in (408, 502, 504):
+            raise BatchFailed(f"状态码 {result.status if result else '无响应'}")
+        if result.status != 200:
+            print(f"GraphQL 请求失败，状态码 {result.status}")
+            return {repo: None for repo in repos}
+        body = result_json(result)
+        errors = body.get('errors') or []
+        if any(error.get('type') in ('RESOURCE_LIMITS_EXCEEDED', 'MAX_NODE_LIMIT_EXCEEDED') for error in errors):
+            raise BatchFailed("资源超限")
+        data = body.get('data') or {}
+        self._update_rate_limit(data.get('rateLimit'))
+        # 不存在的仓库在 data 中为 null，并在 errors 中带 NOT_FOUND；其他原因为 null 的按查询失败处理
+        not_found = {error['path'][0] for error in errors if error.get('type') == 'NOT_FOUND' and error.get('path')}
+        results = {}
+        for i, repo in enumerate(repos):
+            node = data.get(f"r{i}")
+            results[repo] = parse_repository(node) if node else (NOT_FOUND if f"r{i}" in not_found else None)
+        return results
+
+    async def fetch_batch(self, repos):
+        """
+        查询一批仓库，失败时批大小减半并拆分重试
+
+        Returns:
+            dict: {(org, repo): (元数据, README 文本)}，仓库不存在时为 NOT_FOUND，查询失败时为 None
+        """
+        try:
+            results = await self._query(repos)
+        except BatchFailed as e:
+            if len(repos) == 1:
+                print(f"GraphQL 查询失败，跳过仓库 {repos[0][0]}/{repos[0][1]}: {e}")
+                return {repos[0]: None}
+            self.batch_size = min(self.batch_size, max(1, len(repos) // 2))
+            self._successes = 0
+            print(f"GraphQL 批量查询失败（{e}），批大小减为 {self.batch_size}")
+            half = len(repos) // 2
+            first, second = await asyncio.gather(self.fetch_batch(repos[:half]), self.fetch_batch(repos[half:]))
+            return {**first, **second}
+        self._successes += 1
+        if self._successes >= 5 and self.batch_size < self.max_batch_size:
+            # 连续成功后逐步恢复批大小
+            self.batch_size = min(self.max_batch_size, self.batch_size * 2)
+            self._successes = 0
+        return results
+
+    def _batches(self, repos):
+        """按当前批大小切分仓库列表；批大小在采集过程中会变化，因此边取边切"""
+        start = 0
+        while start < len(repos):
+            size = self._next_batch_size()
+            yield repos[start:start + size]
+            start += size
+
+    async def fetch_all(self, repos):
+        """
+        批量查询全部仓库，按完成顺序逐批产出
+
+        Args:
+            repos (list): [(org, repo), ...]
+
+        Yields:
+            dict: 一批仓库的结果，同 fetch_batch；整批出错时该批每个仓库的结果都为 None，
+                  调用方对每个仓库都会收到结果，可以记录失败或改用 REST 接口
+        """
+        async def fetch(batch):
+            try:
+                return await self.fetch_batch(batch)
+            except Exception as e:
+                print(f"GraphQL 批量查询出错（{len(batch)} 个仓库）: {e}")
+                return {repo: None for repo in batch}
+
+        async for results in gather_limited(fetch, self._batches(repos), self.concurrency):
+            yield results
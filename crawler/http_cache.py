@@ -0,0 +1,109 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+"""
+HTTP 条件请求缓存
+
+GET 响应连同 ETag / Last-Modified 保存到本地 SQLite；再次请求同一地址时带上 If-None-Match / If-Modified-Since，
+服务端返回 304 时直接使用本地保存的响应体。GitHub 的 304 响应不计入速率限制，
+仓库列表整体重新采集时，未变化的元数据、目录列表和 README 几乎不消耗配额。
+采集引擎在单独的缓存线程中调用读写方法，每个线程复用一个连接，不必每次请求都重新打开数据库。
+"""
+
+HTTP_CACHE_PATH = os.getenv("HTTP_CACHE_PATH", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'http_cache.sqlite3'))
+
+# 影响响应内容的请求头，参与缓存键计算
+VARY_HEADERS = ('Accept',)
+
+
+class HttpCache:
+    def __init__(self, path=HTTP_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()  # 每个线程复用的连接
+        self._stats = {
+            "revalidated": 0,  # 304，直接使用本地响应体
+            "stored": 0,  # 200 且带有校验值，写入缓存
+            "uncacheable": 0,  # 200 但没有 ETag / Last-Modified
+        }
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, url TEXT NOT NULL, etag TEXT, last_modified TEXT, "
+                "headers TEXT NOT NULL, body BLOB NOT NULL, fetched_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # 每个线程一个长期连接，每次操作作为一个事务提交
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous=NORMAL")  # WAL 模式下只在检查点时同步到磁盘，断电最多丢失最近的缓存条目
+            self._local.conn = conn
+        with conn:
+            yield conn
+
+    @staticmethod
+    def make_key(url, headers=None):
+        """根据 URL 和影响响应内容的请求头计算缓存键"""
+        headers = headers or {}
+        material = [url] + [headers.get(name, '') for name in VARY_HEADERS]
+        return hashlib.sha256(json.dumps(material).encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """
+        读取缓存的响应
+
+        Returns:
+            tuple: (etag, last_modified, 响应头 dict, 响应体 bytes)，不存在时返回 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2]), bytes(row[3])
+
+    def conditional_headers(self, entry):
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if entry is not None:
+            etag, last_modified = entry[0], entry[1]
+            if etag:
+                headers['If-None-Match'] = etag
+            if last_modified:
+                headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def store(self, key, url, headers, body):
+        """保存 200 响应；没有 ETag / Last-Modified 的响应无法重新验证，不保存"""
+        etag = headers.get('ETag')
+        last_modified = headers.get('Last-Modified')
+        if not etag and not last_modified:
+            self._stats["uncacheable"] += 1
+            return
+        kept = {name: headers[name] for name in ('Content-Type', 'ETag', 'Last-Modified') if name in headers}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, etag, last_modified, headers, body, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, url, etag, last_modified, json.dumps(kept), body, time.time())
+            )
+        self._stats["stored"] += 1
+
+    def touch(self, key):
+        """304 时刷新条目的验证时间"""
+        self._stats["revalidated"] += 1
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET fetched_at = ? WHERE key = ?", (time.time(), key))
+
+    def stats(self):
+        return dict(self._stats)
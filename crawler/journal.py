@@ -0,0 +1,107 @@
+import os
+import json
+import time
+
+"""
+采集进度日志
+
+每个仓库处理完成后立即追加一行 JSON 到日志文件（.journal.jsonl），每 100 条或每秒 fsync 一次；
+采集中途崩溃或被中断后重新运行，已完成的仓库直接跳过，只重试失败和未处理的仓库。
+仓库不存在、仓库为空等重试也不会成功的结果由调用方记为已完成（ok=True），不算失败。
+整个输入列表处理完后从日志压缩出最终 CSV 并删除日志，因此只有被中断的运行才会留下日志；
+完整运行之后的下一次运行重新采集全部仓库（失败的仓库随之重试），分数与指标总能得到刷新。
+
+日志行格式：{"key": 仓库标识, "ok": 是否已完成, "result": 结果 dict}
+"""
+
+FSYNC_EVERY = 100  # 每写入多少条 fsync 一次
+FSYNC_INTERVAL = 1.0  # 距上次 fsync 超过多少秒时 fsync
+
+
+def json_default(value):
+    """numpy 标量转为 Python 数值，其他类型转为字符串"""
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+def journal_path(output_file):
+    """输出文件对应的日志路径"""
+    return output_file + '.journal.jsonl'
+
+
+class ProgressJournal:
+    def __init__(self, path, fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._entries = {}  # key -> (ok, result)，同一仓库以最后一条记录为准
+        self._load()
+        self._file = open(path, 'ab')
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def _load(self):
+        """读取已有日志；崩溃时可能留下写了一半的最后一行，截掉后再继续追加"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        valid_length = data.rfind(b'\n') + 1
+        for line in data[:valid_length].splitlines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            self._entries[entry['key']] = (entry['ok'], entry['result'])
+        if valid_length < len(data):
+            with open(self.path, 'r+b') as f:
+                f.truncate(valid_length)
+        succeeded = sum(1 for ok, _ in self._entries.values() if ok)
+        print(f"上次运行未完成，从日志 {self.path} 恢复 {succeeded} 个已完成的仓库，"
+              f"{len(self._entries) - succeeded} 个失败的仓库将重试")
+
+    def done(self, key):
+        """该仓库是否已完成（成功或永久性失败）"""
+        entry = self._entries.get(key)
+        return entry is not None and entry[0]
+
+    def record(self, key, result, ok=True):
+        """追加一条处理结果，ok=False 表示可重试的失败，中断后恢复运行时重试"""
+        self._entries[key] = (ok, result)
+        line = json.dumps({'key': key, 'ok': ok, 'result': result}, ensure_ascii=False, default=json_default)
+        self._file.write(line.encode('utf-8') + b'\n')
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._synced_at >= self.fsync_interval:
+            self.sync()
+
+    def sync(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._synced_at = time.monotonic()
+
+    def results(self, include_failed=False):
+        """压缩日志：每个仓库只保留最后一条记录的结果"""
+        return [result for ok, result in self._entries.values()
+                if result is not None and (ok or include_failed)]
+
+    def failures(self):
+        return [key for key, (ok, _) in self._entries.items() if not ok]
+
+    def close(self):
+        self.sync()
+        self._file.close()
+
+    def finish(self):
+        """整个输入列表已处理完：关闭并删除日志，下次运行重新采集全部仓库"""
+        self.close()
+        failures = self.failures()
+        if failures:
+            print(f"{len(failures)} 个仓库处理失败，下次运行时重试")
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._file.closed:
+            self.close()
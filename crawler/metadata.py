@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import sqlite3
+from contextlib import contextmanager
+
+"""
+仓库元数据表
+
+每个仓库的元数据（stars、forks、topics、默认分支、最近推送时间）每次运行只请求一次 API，
+保存到本地 SQLite 表中，知名度、创新性、复杂度各阶段都从这张表读取，不再各自重复请求同一个接口。
+"""
+
+METADATA_DB_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'repo_metadata.sqlite3')
+
+# 仓库元数据接口
+REPO_API_URLS = {
+    'github': "https://api.github.com/repos/{org}/{repo}",
+    'gitee': "https://gitee.com/api/v5/repos/{org}/{repo}",
+}
+
+METADATA_FIELDS = ['stargazers_count', 'forks_count', 'topics', 'default_branch', 'pushed_at']
+
+
+def repo_api_url(platform, org, repo):
+    return REPO_API_URLS[platform].format(org=org, repo=repo)
+
+
+def parse_metadata(data):
+    """从仓库接口的响应中提取元数据"""
+    return {
+        'stargazers_count': data.get('stargazers_count', 0),
+        'forks_count': data.get('forks_count', 0),
+        'topics': data.get('topics') or [],
+        'default_branch': data.get('default_branch') or 'master',
+        'pushed_at': data.get('pushed_at'),
+    }
+
+
+class MetadataStore:
+    def __init__(self, path=METADATA_DB_PATH):
+        self.path = path
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS repo_metadata ("
+                "platform TEXT NOT NULL, repo_name TEXT NOT NULL, "
+                "stargazers_count INTEGER, forks_count INTEGER, topics TEXT, "
+                "default_branch TEXT, pushed_at TEXT, fetched_at REAL NOT NULL, "
+                "PRIMARY KEY (platform, repo_name))"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # 每次操作使用独立连接，采集脚本的多个线程可以同时读写
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, platform, repo_name, max_age=None):
+        """
+        读取仓库元数据
+
+        Args:
+            platform (str): github 或 gitee
+            repo_name (str): org/repo
+            max_age (float): 只接受多少秒内抓取的数据，None 表示不限
+
+        Returns:
+            dict: 元数据，不存在或已过期时返回 None
+        """
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT stargazers_count, forks_count, topics, default_branch, pushed_at, fetched_at "
+                "FROM repo_metadata WHERE platform = ? AND repo_name = ?",
+                (platform, repo_name)
+            ).fetchone()
+        if row is None or (max_age is not None and time.time() - row[5] > max_age):
+            return None
+        return {
+            'stargazers_count': row[0],
+            'forks_count': row[1],
+            'topics': json.loads(row[2]) if row[2] else [],
+            'default_branch': row[3],
+            'pushed_at': row[4],
+        }
+
+    def upsert(self, platform, repo_name, metadata):
+        """写入或更新仓库元数据"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO repo_metadata "
+                "(platform, repo_name, stargazers_count, forks_count, topics, default_branch, pushed_at, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (platform, repo_name, metadata['stargazers_count'], metadata['forks_count'],
+                 json.dumps(metadata['topics'], ensure_ascii=False), metadata['default_branch'],
+                 metadata['pushed_at'], time.time())
+            )
+
+    async def afetch(self, platform, org, repo, get_json, max_age=None):
+        """
+        获取仓库元数据：表中已有（且未过期）时直接返回，否则请求一次仓库接口并写入表中
+
+        Args:
+            platform (str): github 或 gitee
+            org (str): 组织或用户名
+            repo (str): 仓库名
+            get_json (callable): 协程函数，接收 URL 返回解析后的 JSON，失败时返回 None
+            max_age (float): 表中数据的有效期（秒），None 表示不限
+
+        Returns:
+            dict: 元数据，请求失败时返回 None
+        """
+        repo_name = f"{org}/{repo}"
+        metadata = self.get(platform, repo_name, max_age)
+        if metadata is not None:
+            return metadata
+        data = await get_json(repo_api_url(platform, org, repo))
+        if data is None:
+            return None
+        metadata = parse_metadata(data)
+        self.upsert(platform, repo_name, metadata)
+        return metadata
@@ -0,0 +1,150 @@
+import os
+import time
+import bisect
+from collections import defaultdict
+
+"""
+采集指标
+
+按主机记录请求耗时直方图、状态码计数、重试次数、各类等待时间（退避重试、令牌桶限速、Token 配额耗尽）、
+传输字节数与最近一次响应头中的剩余配额。
+指标以 Prometheus 文本格式写入文件（默认仓库根目录下的 crawl_metrics.prom，可用环境变量 CRAWLER_METRICS_FILE 修改），
+设置 CRAWLER_METRICS_PORT 时另外在该端口提供 /metrics 接口；采集结束时打印各主机的汇总。
+"""
+
+METRICS_FILE = os.getenv("CRAWLER_METRICS_FILE", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawl_metrics.prom'))
+METRICS_PORT = os.getenv("CRAWLER_METRICS_PORT")
+
+# 请求耗时直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 等待时间的类别
+WAIT_REASONS = ('backoff', 'rate_limit', 'token_pool')
+
+
+class HostMetrics:
+    def __init__(self):
+        self.latency_counts = [0] * (len(LATENCY_BUCKETS) + 1)  # 最后一个桶为 +Inf
+        self.latency_sum = 0.0  # 收到响应的请求耗时之和，与 latency_counts、requests 对应
+        self.requests = 0
+        self.statuses = defaultdict(int)
+        self.errors = 0  # 网络错误与超时
+        self.error_latency_sum = 0.0  # 网络错误与超时的请求耗时之和，不计入直方图
+        self.retries = 0
+        self.wait_seconds = defaultdict(float)
+        self.bytes = 0
+        self.quota_remaining = None
+        self.quota_limit = None
+
+    def percentile(self, q):
+        """由直方图估算分位数（返回所在桶的上界）"""
+        target = q * self.requests
+        seen = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float('inf'),), self.latency_counts):
+            seen += count
+            if seen >= target and count:
+                return bound
+        return 0.0
+
+
+class CrawlMetrics:
+    def __init__(self):
+        self.hosts = defaultdict(HostMetrics)
+        self.started = time.time()
+
+    def observe_response(self, host, status, latency, size, headers):
+        """记录一次收到响应的请求"""
+        m = self.hosts[host]
+        m.requests += 1
+        m.latency_counts[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        m.latency_sum += latency
+        m.statuses[status] += 1
+        m.bytes += size
+        try:
+            if 'X-RateLimit-Remaining' in headers:
+                m.quota_remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                m.quota_limit = int(headers['X-RateLimit-Limit'])
+        except ValueError:
+            pass
+
+    def observe_error(self, host, latency):
+        """记录一次网络错误或超时"""
+        m = self.hosts[host]
+        m.errors += 1
+        m.error_latency_sum += latency
+
+    def observe_retry(self, host):
+        self.hosts[host].retries += 1
+
+    def observe_wait(self, host, reason, seconds):
+        """记录等待时间，reason 为 WAIT_REASONS 之一"""
+        if seconds > 0:
+            self.hosts[host].wait_seconds[reason] += seconds
+
+    def prometheus_text(self):
+        """Prometheus 文本格式"""
+        lines = [
+            "# HELP crawler_request_duration_seconds 请求耗时",
+            "# TYPE crawler_request_duration_seconds histogram",
+        ]
+        for host, m in sorted(self.hosts.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS, m.latency_counts):
+                cumulative += count
+                lines.append(f'crawler_request_duration_seconds_bucket{{host="{host}",le="{bound}"}} {cumulative}')
+            lines.append(f'crawler_request_duration_seconds_bucket{{host="{host}",le="+Inf"}} {m.requests}')
+            lines.append(f'crawler_request_duration_seconds_sum{{host="{host}"}} {m.latency_sum:.6f}')
+            lines.append(f'crawler_request_duration_seconds_count{{host="{host}"}} {m.requests}')
+
+        lines += ["# HELP crawler_responses_total 按状态码统计的响应数", "# TYPE crawler_responses_total counter"]
+        for host, m in sorted(self.hosts.items()):
+            for status, count in sorted(m.statuses.items()):
+                lines.append(f'crawler_responses_total{{host="{host}",status="{status}"}} {count}')
+
+        lines += ["# HELP crawler_errors_total 网络错误与超时次数", "# TYPE crawler_errors_total counter"]
+        lines += [f'crawler_errors_total{{host="{host}"}} {m.errors}' for host, m in sorted(self.hosts.items())]
+        lines += ["# HELP crawler_error_duration_seconds_total 网络错误与超时的请求耗时之和",
+                  "# TYPE crawler_error_duration_seconds_total counter"]
+        lines += [f'crawler_error_duration_seconds_total{{host="{host}"}} {m.error_latency_sum:.6f}'
+                  for host, m in sorted(self.hosts.items())]
+        lines += ["# HELP crawler_retries_total 重试次数", "# TYPE crawler_retries_total counter"]
+        lines += [f'crawler_retries_total{{host="{host}"}} {m.retries}' for host, m in sorted(self.hosts.items())]
+        lines += ["# HELP crawler_response_bytes_total 接收的响应体字节数", "# TYPE crawler_response_bytes_total counter"]
+        lines += [f'crawler_response_bytes_total{{host="{host}"}} {m.bytes}' for host, m in sorted(self.hosts.items())]
+
+        lines += ["# HELP crawler_wait_seconds_total 各请求等待时间之和", "# TYPE crawler_wait_seconds_total counter"]
+        for host, m in sorted(self.hosts.items()):
+            for reason in WAIT_REASONS:
+                lines.append(f'crawler_wait_seconds_total{{host="{host}",reason="{reason}"}} '
+                             f'{m.wait_seconds[reason]:.3f}')
+
+        lines += ["# HELP crawler_quota_remaining 最近一次响应头中的剩余配额", "# TYPE crawler_quota_remaining gauge"]
+        lines += [f'crawler_quota_remaining{{host="{host}"}} {m.quota_remaining}'
+                  for host, m in sorted(self.hosts.items()) if m.quota_remaining is not None]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path=METRICS_FILE):
+        """写入指标文件（先写临时文件再替换，读取方不会读到一半的内容）"""
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def summary(self):
+        """各主机的汇总，每个主机一行"""
+        elapsed = max(time.time() - self.started, 1e-9)
+        lines = [f"采集耗时 {elapsed:.1f} 秒"]
+        for host, m in sorted(self.hosts.items()):
+            statuses = " ".join(f"{status}:{count}" for status, count in sorted(m.statuses.items()))
+            waits = "，".join(f"{reason} {m.wait_seconds[reason]:.1f}s" for reason in WAIT_REASONS
+                             if m.wait_seconds[reason])
+            quota = f"，剩余配额 {m.quota_remaining}/{m.quota_limit}" if m.quota_remaining is not None else ""
+            errors = f"{m.errors}（平均 {m.error_latency_sum / m.errors:.3f}s）" if m.errors else "0"
+            lines.append(
+                f"{host}: {m.requests} 个请求（{m.requests / elapsed:.1f}/秒），"
+                f"平均 {m.latency_sum / max(m.requests, 1):.3f}s，p50≤{m.percentile(0.5)}s，p95≤{m.percentile(0.95)}s，"
+                f"状态码 {statuses or '-'}，错误 {errors}，重试 {m.retries}，"
+                f"{m.bytes / 1024 / 1024:.1f} MB，累计等待（各请求相加） {waits or '无'}{quota}")
+        return lines
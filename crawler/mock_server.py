@@ -0,0 +1,265 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import re
+import hashlib
+from aiohttp import web
+
+"""
+采集用的本地模拟服务器
+
+模拟 GitHub / Gitee 接口与 README 原始文件，路径为 /<原主机名>/<原路径>，
+与 crawler.engine 的 CRAWLER_MOCK_URL 配合使用，在不消耗真实配额的情况下比较采集吞吐量（每秒请求数）。
+每个响应都带 X-RateLimit-Remaining / X-RateLimit-Reset 头，配额按窗口计数，用于检验令牌桶不会超出配额；
+响应带 ETag，条件请求命中时与 GitHub 一样返回 304 且不计入配额。
+POST /api.github.com/graphql 返回固定格式的 GraphQL 响应：按别名返回每个仓库，
+仓库名以 missing 开头时返回 null 与 NOT_FOUND 错误，单次查询的仓库数超过 MOCK_GRAPHQL_MAX_REPOS 时返回资源超限错误。
+REST 接口中，仓库名以 missing 开头的仓库返回 404，以 empty 开头的仓库的提交、文件树与目录接口返回 409（空仓库）。
+
+使用方法：
+    python crawler/mock_server.py [端口]
+    CRAWLER_MOCK_URL=http://127.0.0.1:8080 python Sample_Data/star_fork2.py
+
+环境变量：
+    MOCK_LATENCY      每个请求的模拟延迟（秒），默认 0.2
+    MOCK_RATE_LIMIT   每个主机每个窗口的配额，默认 5000
+    MOCK_RATE_WINDOW  配额窗口长度（秒），默认 60
+    MOCK_GRAPHQL_MAX_REPOS  单次 GraphQL 查询允许的仓库数，默认 100
+"""
+
+LATENCY = float(os.getenv("MOCK_LATENCY", "0.2"))
+RATE_LIMIT = int(os.getenv("MOCK_RATE_LIMIT", "5000"))
+RATE_WINDOW = int(os.getenv("MOCK_RATE_WINDOW", "60"))
+GRAPHQL_MAX_REPOS = int(os.getenv("MOCK_GRAPHQL_MAX_REPOS", "100"))
+
+# 匹配查询中的 r0: repository(owner: $o0, name: $n0)
+GRAPHQL_ALIAS_RE = re.compile(r'(\w+): repository\(owner: \$(\w+), name: \$(\w+)\)')
+
+README_TEXT = "# Mock project\n\nA novel and innovative tool for testing the crawler.\n"
+
+
+def repo_json(owner, repo):
+    return {
+        "full_name": f"{owner}/{repo}",
+        "stargazers_count": len(repo) * 7,
+        "forks_count": len(owner),
+        "topics": ["mock", "crawler"],
+        "default_branch": "main",
+        "pushed_at": "2024-01-01T00:00:00Z",
+    }
+
+
+def contents_json(base_url, path):
+    """模拟 contents 接口：根目录下有两个子目录，子目录中只有文件"""
+    items = [
+        {"name": "main.py", "type": "file"},
+        {"name": "config.yaml", "type": "file"},
+        {"name": "README.md", "type": "file"},
+    ]
+    if not path:
+        for name in ("src", "docs"):
+            url = f"{base_url}/{name}"
+            items.append({"name": name, "type": "dir", "url": url, "_links": {"self": url}})
+    return items
+
+
+# 模拟的 Git 树：sha -> [(名称, 类型, 大小)]，类型为 blob 或 tree（tree 的 sha 即其名称）
+MOCK_TREES = {
+    'root': [("main.py", "blob", 1200), ("config.yaml", "blob", 80), ("README.md", "blob", 300),
+             ("src", "tree", 0), ("docs", "tree", 0)],
+    'src': [("app.py", "blob", 4000), ("lib", "tree", 0)],
+    'lib': [("util.c", "blob", 2500), ("util.h", "blob", 400)],
+    'docs': [("index.md", "blob", 900)],
+}
+
+
+def head_sha(owner, repo):
+    """默认分支的提交 SHA；仓库名以 active 开头时每分钟变化一次，模拟有新提交的仓库"""
+    material = f"{owner}/{repo}" + (str(int(time.time() // 60)) if repo.startswith("active") else "")
+    return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+
+def tree_json(sha, recursive, repo):
+    """模拟 git/trees 接口；仓库名以 huge 开头时，根目录的递归请求返回 truncated"""
+    sha = sha if sha in MOCK_TREES else 'root'
+    tree = []
+
+    def walk(current, prefix):
+        for name, kind, size in MOCK_TREES[current]:
+            item = {"path": prefix + name, "type": kind, "sha": name if kind == "tree" else f"{current}-{name}"}
+            if kind == "blob":
+                item["size"] = size
+            tree.append(item)
+            if kind == "tree" and recursive:
+                walk(name, prefix + name + "/")
+
+    walk(sha, "")
+    truncated = recursive and sha == 'root' and repo.startswith("huge")
+    if truncated:
+        tree = tree[:3]
+    return {"sha": sha, "tree": tree, "truncated": truncated}
+
+
+class RateLimiter:
+    """按 (主机, Token) 计数的固定窗口配额"""
+
+    def __init__(self):
+        self.windows = {}
+
+    def hit(self, host):
+        now = time.time()
+        reset, used = self.windows.get(host, (0, 0))
+        if now >= reset:
+            reset, used = now + RATE_WINDOW, 0
+        used += 1
+        self.windows[host] = (reset, used)
+        return max(0, RATE_LIMIT - used), int(reset), used > RATE_LIMIT
+
+    def peek(self, host):
+        """查看配额但不计数"""
+        now = time.time()
+        reset, used = self.windows.get(host, (0, 0))
+        if now >= reset:
+            reset, used = now + RATE_WINDOW, 0
+        return max(0, RATE_LIMIT - used), int(reset), False
+
+
+limiter = RateLimiter()
+
+
+def resolve(host, path, query=""):
+    """返回 (状态码, 响应体, Content-Type)"""
+    parts = path.split('/')
+    if host in ("raw.githubusercontent.com",) or (host == "gitee.com" and "raw" in parts):
+        return 200, README_TEXT, "text/plain"
+    # /repos/<owner>/<repo>[/contents[/<path>]]，Gitee 为 /api/v5/repos/...
+    if parts[:2] == ["api", "v5"]:
+        parts = parts[2:]
+    if len(parts) >= 3 and parts[0] == "repos":
+        owner, repo = parts[1], parts[2]
+        if repo.startswith("missing"):
+            return 404, json.dumps({"message": "Not Found"}), "application/json"
+        if repo.startswith("empty") and len(parts) > 3:
+            return 409, json.dumps({"message": "Git Repository is empty."}), "application/json"
+        if len(parts) == 3:
+            return 200, json.dumps(repo_json(owner, repo)), "application/json"
+        if parts[3] == "commits" and len(parts) == 5:
+            # 只返回 SHA 文本（Accept: application/vnd.github.sha）
+            return 200, head_sha(owner, repo), "text/plain"
+        if parts[3] == "branches" and len(parts) == 5:
+            return 200, json.dumps({"name": parts[4], "commit": {"sha": head_sha(owner, repo)}}), "application/json"
+        if parts[3] == "git" and len(parts) == 6 and parts[4] == "trees":
+            recursive = "recursive=1" in query
+            return 200, json.dumps(tree_json(parts[5], recursive, repo)), "application/json"
+        if parts[3] == "contents":
+            base_url = f"https://{host}/{path.rstrip('/')}"
+            return 200, json.dumps(contents_json(base_url, "/".join(parts[4:]))), "application/json"
+    return 404, json.dumps({"message": "Not Found"}), "application/json"
+
+
+async def handle(request):
+    host = request.match_info['host']
+    path = request.match_info['path']
+    status, body, content_type = resolve(host, path, request.query_string)
+    etag = '"' + hashlib.sha1(body.encode('utf-8')).hexdigest() + '"'
+    not_modified = status == 200 and request.headers.get('If-None-Match') == etag
+    # 与 GitHub 一致，304 不消耗配额
+    quota_key = (host, request.headers.get('Authorization'))  # 每个 Token 的配额分别计数
+    remaining, reset, exceeded = limiter.peek(quota_key) if not_modified else limiter.hit(quota_key)
+    headers = {"X-RateLimit-Limit": str(RATE_LIMIT), "X-RateLimit-Remaining": str(remaining),
+               "X-RateLimit-Reset": str(reset)}
+    if exceeded:
+        request.app['stats']['rejected'] += 1
+        return web.json_response({"message": "API rate limit exceeded"}, status=403, headers=headers)
+    request.app['stats']['served'] += 1
+    await asyncio.sleep(LATENCY)
+    if not_modified:
+        request.app['stats']['not_modified'] += 1
+        return web.Response(status=304, headers={**headers, "ETag": etag})
+    if status == 200:
+        headers["ETag"] = etag
+    return web.Response(status=status, text=body, content_type=content_type, headers=headers)
+
+
+def graphql_repository(owner, repo, with_readme):
+    data = repo_json(owner, repo)
+    node = {
+        "stargazerCount": data["stargazers_count"],
+        "forkCount": data["forks_count"],
+        "pushedAt": data["pushed_at"],
+        "defaultBranchRef": {"name": data["default_branch"]},
+        "repositoryTopics": {"nodes": [{"topic": {"name": name}} for name in data["topics"]]},
+    }
+    if with_readme:
+        node["readme"] = {"text": README_TEXT}
+    return node
+
+
+async def handle_graphql(request):
+    payload = await request.json()
+    query = payload.get('query', '')
+    variables = payload.get('variables') or {}
+    aliases = GRAPHQL_ALIAS_RE.findall(query)
+    remaining, reset, exceeded = limiter.hit(('graphql', request.headers.get('Authorization')))
+    headers = {"X-RateLimit-Limit": str(RATE_LIMIT), "X-RateLimit-Remaining": str(remaining),
+               "X-RateLimit-Reset": str(reset)}
+    if exceeded:
+        request.app['stats']['rejected'] += 1
+        return web.json_response({"message": "API rate limit exceeded"}, status=403, headers=headers)
+    request.app['stats']['served'] += 1
+    await asyncio.sleep(LATENCY * (1 + len(aliases) / 20))
+    if len(aliases) > GRAPHQL_MAX_REPOS:
+        return web.json_response({"errors": [{"type": "RESOURCE_LIMITS_EXCEEDED", "message": "too many repositories"}]},
+                                 headers=headers)
+
+    reset_at = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(reset))
+    data = {"rateLimit": {"cost": 1, "remaining": remaining, "resetAt": reset_at}}
+    errors = []
+    for alias, owner_var, name_var in aliases:
+        owner, repo = variables.get(owner_var), variables.get(name_var)
+        if repo.startswith("missing"):
+            data[alias] = None
+            errors.append({"type": "NOT_FOUND", "path": [alias],
+                           "message": f"Could not resolve to a Repository with the name '{owner}/{repo}'."})
+        else:
+            data[alias] = graphql_repository(owner, repo, "readme:" in query)
+    body = {"data": data}
+    if errors:
+        body["errors"] = errors
+    return web.json_response(body, headers=headers)
+
+
+async def report(app):
+    """每 5 秒打印一次吞吐量"""
+    last = 0
+    while True:
+        await asyncio.sleep(5)
+        served = app['stats']['served']
+        print(f"已响应 {served} 个请求，{(served - last) / 5:.1f} 请求/秒，"
+              f"304 {app['stats']['not_modified']} 个，拒绝 {app['stats']['rejected']} 个")
+        last = served
+
+
+async def start_report(app):
+    app['report'] = asyncio.ensure_future(report(app))
+
+
+async def stop_report(app):
+    app['report'].cancel()
+
+
+def create_app():
+    app = web.Application()
+    app['stats'] = {'served': 0, 'not_modified': 0, 'rejected': 0}
+    app.router.add_post('/api.github.com/graphql', handle_graphql)
+    app.router.add_get('/{host}/{path:.*}', handle)
+    app.on_startup.append(start_report)
+    app.on_cleanup.append(stop_report)
+    return app
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8080
+    web.run_app(create_app(), host='127.0.0.1', port=port)
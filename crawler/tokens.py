@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import asyncio
+
+"""
+访问令牌池
+
+GitHub / Gitee 的多个 Token 组成令牌池，每个 Token 的剩余配额与重置时间从响应头
+X-RateLimit-Remaining / X-RateLimit-Reset 中更新；每个请求分配给剩余配额最多的 Token，
+配额耗尽的 Token 暂停到重置时间，全部耗尽时等待最早重置的 Token。
+
+Token 来源（按优先级）：
+    1. 环境变量 GITHUB_TOKENS / GITEE_TOKENS，多个 Token 用逗号分隔
+    2. 配置文件（环境变量 CRAWLER_TOKENS_FILE 指定，默认仓库根目录下的 crawler_tokens.json），
+       格式为 {"github": ["..."], "gitee": ["..."]}
+    3. 脚本中的 Token 变量（作为默认值传入，仓库中只保留 "xxx" 或空字符串占位，不要提交真实 Token）
+某个平台没有配置任何 Token 时打印警告，该平台的请求不带认证，配额很低（GitHub 每小时 60 次）。
+"""
+
+TOKENS_FILE = os.getenv("CRAWLER_TOKENS_FILE", os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'crawler_tokens.json'))
+
+# 脚本中未替换的占位值，视为没有配置
+PLACEHOLDER_TOKENS = {'', 'xxx'}
+
+# 需要携带 Token 的接口主机
+PLATFORM_HOSTS = {
+    'api.github.com': 'github',
+    'gitee.com': 'gitee',
+}
+
+
+def request_resource(path):
+    """请求所属的配额类别：GitHub 的 GraphQL 与 REST 接口配额分别计算"""
+    return 'graphql' if path.rstrip('/').endswith('/graphql') else 'core'
+
+
+class Quota:
+    def __init__(self):
+        self.remaining = None  # 剩余配额，收到第一个响应前未知
+        self.limit = None
+        self.reset = 0  # 配额重置时间（Unix 时间戳）
+        self.inflight = 0
+
+
+class AccessToken:
+    def __init__(self, platform, value):
+        self.platform = platform
+        self.value = value
+        self.quotas = {}  # 配额类别 -> Quota
+        self.used = 0  # 本次运行发出的请求数
+
+    def quota(self, resource):
+        if resource not in self.quotas:
+            self.quotas[resource] = Quota()
+        return self.quotas[resource]
+
+    def auth_headers(self):
+        return {'Authorization': f'token {self.value}'}
+
+    def headroom(self, resource, now):
+        """剩余可用配额；未知或已过重置时间时视为无限，优先使用以尽快获得配额信息"""
+        quota = self.quota(resource)
+        if quota.remaining is None or now >= quota.reset:
+            return float('inf')
+        return quota.remaining - quota.inflight
+
+    def __repr__(self):
+        return f"{self.platform}:…{self.value[-4:]}"
+
+
+class TokenPool:
+    def __init__(self, tokens=None):
+        self._tokens = {}  # platform -> [AccessToken]
+        for platform, values in (tokens or {}).items():
+            self._tokens[platform] = [AccessToken(platform, value) for value in dict.fromkeys(values) if value]
+
+    @classmethod
+    def load(cls, **defaults):
+        """
+        按环境变量、配置文件、脚本默认值的顺序加载 Token，占位值视为未配置
+
+        Args:
+            defaults: 各平台的默认 Token 列表，如 github=[GITHUB_TOKEN]
+
+        Returns:
+            TokenPool
+        """
+        config = {}
+        if os.path.exists(TOKENS_FILE):
+            with open(TOKENS_FILE, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        tokens = {}
+        for platform in set(defaults) | set(config) | {'github', 'gitee'}:
+            env_value = os.getenv(f"{platform.upper()}_TOKENS")
+            if env_value:
+                tokens[platform] = [value.strip() for value in env_value.split(',')]
+            elif config.get(platform):
+                tokens[platform] = config[platform]
+            else:
+                tokens[platform] = [value for value in defaults.get(platform) or [] if value not in PLACEHOLDER_TOKENS]
+            if not tokens[platform]:
+                print(f"警告：未配置 {platform} Token（环境变量 {platform.upper()}_TOKENS 或 {TOKENS_FILE}），"
+                      f"{platform} 请求将不带认证，配额很低")
+        return cls(tokens)
+
+    def has(self, platform):
+        return bool(self._tokens.get(platform))
+
+    async def acquire(self, platform, resource='core'):
+        """选出该类配额剩余最多的 Token；全部耗尽时等待最早重置的 Token"""
+        tokens = self._tokens[platform]
+        while True:
+            now = time.time()
+            # 剩余配额相同（如都未知）时选在途请求最少的，避免启动时全部请求集中到第一个 Token
+            token = max(tokens, key=lambda t: (t.headroom(resource, now), -t.quota(resource).inflight))
+            if token.headroom(resource, now) > 0:
+                token.quota(resource).inflight += 1
+                token.used += 1
+                return token
+            wait = min(t.quota(resource).reset for t in tokens) - now
+            print(f"{platform} 的 {len(tokens)} 个 Token {resource} 配额均已耗尽，等待 {wait:.0f} 秒")
+            await asyncio.sleep(max(1.0, wait))
+
+    def release(self, token, resource='core'):
+        token.quota(resource).inflight -= 1
+
+    def update(self, token, headers, resource='core'):
+        """根据响应头更新 Token 的剩余配额与重置时间"""
+        quota = token.quota(resource)
+        try:
+            if 'X-RateLimit-Remaining' in headers:
+                quota.remaining = int(headers['X-RateLimit-Remaining'])
+            if 'X-RateLimit-Limit' in headers:
+                quota.limit = int(headers['X-RateLimit-Limit'])
+            if 'X-RateLimit-Reset' in headers:
+                quota.reset = float(headers['X-RateLimit-Reset'])
+        except ValueError:
+            pass
+
+    def report(self):
+        """汇总各平台、各类配额的使用情况"""
+        now = time.time()
+        lines = []
+        for platform, tokens in self._tokens.items():
+            if not tokens:
+                continue
+            lines.append(f"{platform}: {len(tokens)} 个 Token，本次请求 {sum(t.used for t in tokens)} 次")
+            resources = sorted({resource for t in tokens for resource in t.quotas})
+            for resource in resources:
+                known = [t.quotas[resource] for t in tokens
+                         if resource in t.quotas and t.quotas[resource].remaining is not None]
+                parked = sum(1 for q in known if q.remaining == 0 and now < q.reset)
+                lines.append(f"{platform} {resource}: 剩余配额 {sum(q.remaining for q in known)}/"
+                             f"{sum(q.limit or 0 for q in known)}，已耗尽 {parked} 个 Token")
+        return lines
@@ -0,0 +1,20 @@
+import gc
+import os
+
+"""
+gunicorn 配置
+
+preload_app：数据在主进程中只加载一次，fork 出的 worker 以写时复制的方式共享评分表、
+仓库索引和预排序数组；README 存储通过 mmap 映射，所有 worker 共享同一份页缓存。
+主进程加载完成后冻结 gc，避免 worker 中的垃圾回收遍历共享对象、触发页面复制。
+"""
+
+preload_app = True
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 8))  # SSE 长连接只占用线程，不占用整个 worker
+
+
+def when_ready(server):
+    # 主进程中已加载的对象全部移入永久代，worker 的 gc 不再扫描它们
+    gc.freeze()
+    server.log.info("数据已预加载，gc 已冻结 %d 个对象", gc.get_freeze_count())
@@ -0,0 +1,195 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from contextlib import contextmanager
+
+"""
+大模型响应缓存
+
+以模型、消息、temperature、top_p、max_tokens 的哈希为键，把响应持久化到本地 SQLite；
+条目带有过期时间，总条数超过上限时按最近访问时间淘汰；
+同一进程内对同一提示的并发请求只会发出一次上游调用，其余请求等待并共享结果。
+后台任务失败时在 failures 表中记录一段时间，所有 worker 都能查询到失败状态；失败结果本身不会被缓存。
+"""
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", 7 * 24 * 3600))  # 缓存有效期（秒）
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 10000))  # 最大缓存条数
+LLM_FAILURE_TTL = int(os.getenv("LLM_FAILURE_TTL", 600))  # 失败状态保留时间（秒），只用于状态查询
+
+# 参与缓存键计算的请求字段
+KEY_FIELDS = ('model', 'messages', 'temperature', 'top_p', 'max_tokens')
+
+
+class _InflightCall:
+    """正在进行中的上游调用，供并发请求等待"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMResponseCache:
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,  # 等待其他请求的上游调用而未重复请求的次数
+            "saved_seconds": 0.0,  # 命中缓存节省的上游耗时
+        }
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT NOT NULL, latency REAL NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_accessed ON responses (accessed_at)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS failures ("
+                "key TEXT PRIMARY KEY, message TEXT NOT NULL, failed_at REAL NOT NULL)"
+            )
+
+    @contextmanager
+    def _connect(self):
+        # 每次操作使用独立连接，避免在线程间共享 sqlite 连接
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:  # 正常退出时提交，异常时回滚
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def make_key(payload):
+        """根据请求体中影响输出的字段计算缓存键"""
+        material = {field: payload.get(field) for field in KEY_FIELDS}
+        encoded = json.dumps(material, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key):
+        """读取未过期的缓存，返回 (响应文本, 上游耗时)，不存在时返回 None"""
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT response, latency FROM responses WHERE key = ? AND created_at >= ?",
+                (key, now - self.ttl)
+            ).fetchone()
+            if row is not None:
+                conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+        return row
+
+    def set(self, key, response, latency):
+        """写入缓存，并淘汰过期条目和超出上限的最久未访问条目"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, response, latency, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, response, latency, now, now)
+            )
+            conn.execute("DELETE FROM responses WHERE created_at < ?", (now - self.ttl,))
+            conn.execute("DELETE FROM failures WHERE key = ?", (key,))
+            count = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def mark_failed(self, key, message):
+        """记录后台任务失败，供其他 worker 的状态查询使用"""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("INSERT OR REPLACE INTO failures (key, message, failed_at) VALUES (?, ?, ?)",
+                         (key, message, now))
+            conn.execute("DELETE FROM failures WHERE failed_at < ?", (now - LLM_FAILURE_TTL,))
+
+    def get_failure(self, key):
+        """返回未过期的失败说明，没有失败记录时返回 None"""
+        with self._connect() as conn:
+            row = conn.execute("SELECT message FROM failures WHERE key = ? AND failed_at >= ?",
+                               (key, time.time() - LLM_FAILURE_TTL)).fetchone()
+        return row[0] if row is not None else None
+
+    def clear_failure(self, key):
+        """重新提交任务前清除旧的失败记录"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM failures WHERE key = ?", (key,))
+
+    def lookup(self, key):
+        """读取缓存并记录命中情况，未命中时返回 None"""
+        cached = self.get(key)
+        if cached is None:
+            return None
+        response, latency = cached
+        with self._lock:
+            self._stats["hits"] += 1
+            self._stats["saved_seconds"] += latency
+        return response
+
+    def get_or_call(self, payload, call):
+        """
+        优先返回缓存结果，未命中时调用上游，并发的相同请求共享同一次调用
+
+        Args:
+            payload (dict): 发送给大模型的请求体
+            call (callable): 实际调用上游的函数，返回响应文本，失败时返回 None
+
+        Returns:
+            str: 响应文本，上游调用失败时为 None（失败结果不会被缓存）
+        """
+        key = self.make_key(payload)
+        response = self.lookup(key)
+        if response is not None:
+            return response
+
+        with self._lock:
+            inflight = self._inflight.get(key)
+            leader = inflight is None
+            if leader:
+                inflight = _InflightCall()
+                self._inflight[key] = inflight
+                self._stats["misses"] += 1
+            else:
+                self._stats["coalesced"] += 1
+
+        if not leader:
+            inflight.event.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return inflight.result
+
+        try:
+            start = time.time()
+            inflight.result = call()
+            if inflight.result is not None:
+                self.set(key, inflight.result, time.time() - start)
+            return inflight.result
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            inflight.event.set()
+
+    def stats(self):
+        """返回缓存命中情况"""
+        with self._lock:
+            stats = dict(self._stats)
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = round((stats["hits"] + stats["coalesced"]) / lookups, 4) if lookups else 0
+        with self._connect() as conn:
+            stats["entries"] = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return stats
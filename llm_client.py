@@ -0,0 +1,183 @@
+import json
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+大模型API客户端
+
+复用带连接池的 requests.Session，避免每次分析都重新进行 TLS 握手；
+用全局信号量限制同时进行的上游调用数；
+连续失败达到阈值后熔断，熔断期间直接返回失败，由调用方给出"分析服务暂时不可用"的提示，
+冷却时间过后放行一次试探请求，成功则恢复。
+"""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold  # 连续失败多少次后熔断
+        self.reset_timeout = reset_timeout  # 熔断后多久放行试探请求（秒）
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """判断当前是否允许发出请求"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._probing = False
+            if self.state == self.HALF_OPEN and not self._probing:
+                self._probing = True  # 半开状态下只放行一个试探请求
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.time()
+                self._probing = False
+
+
+def read_llm_stream(response, on_token):
+    """逐行解析流式响应（SSE），每收到一段文本就回调 on_token，返回完整文本"""
+    response.encoding = 'utf-8'
+    pieces = []
+    for line in response.iter_lines(decode_unicode=True):
+        if not line or not line.startswith('data:'):
+            continue
+        chunk = line[len('data:'):].strip()
+        if chunk == '[DONE]':
+            break
+        delta = json.loads(chunk)['choices'][0].get('delta', {}).get('content')
+        if delta:
+            pieces.append(delta)
+            on_token(delta)
+    return "".join(pieces)
+
+
+class LLMClient:
+    def __init__(self, api_url, api_key, timeout=15, max_concurrency=8,
+                 failure_threshold=5, reset_timeout=30):
+        self.api_url = api_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+        # 保持长连接，连接池大小与并发上限一致
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._stats = {
+            "requests": 0,  # 实际发出的上游请求数
+            "successes": 0,
+            "errors": 0,
+            "rejected": 0,  # 熔断或排队超时而未发出的调用数
+            "latency_total": 0.0,
+            "latency_max": 0.0,
+        }
+
+    def _count(self, key, value=1):
+        with self._lock:
+            self._stats[key] += value
+
+    def _record_latency(self, latency):
+        with self._lock:
+            self._stats["latency_total"] += latency
+            self._stats["latency_max"] = max(self._stats["latency_max"], latency)
+
+    def chat(self, payload, retry=3, on_token=None):
+        """
+        发送 chat/completions 请求
+
+        Args:
+            payload (dict): 请求体
+            retry (int): 重试次数
+            on_token (callable): 流式回调，传入时以流式方式请求，每生成一段文本调用一次
+
+        Returns:
+            str: 模型生成的文本，失败或熔断时返回 None
+        """
+        streamed = []  # 已推送给调用方的文本，推送后不能再重试，否则内容会重复
+
+        def forward(token):
+            streamed.append(token)
+            on_token(token)
+
+        # 重试机制
+        for attempt in range(retry):
+            if not self._slots.acquire(timeout=self.timeout):
+                print("大模型并发调用已达上限，等待超时")
+                self._count("rejected")
+                return None
+            if not self.breaker.allow():
+                self._slots.release()
+                print("大模型服务熔断中，直接返回失败")
+                self._count("rejected")
+                return None
+
+            start = time.time()
+            try:
+                self._count("requests")
+                response = self.session.post(
+                    self.api_url,
+                    json=dict(payload, stream=True) if on_token else payload,
+                    timeout=self.timeout,
+                    stream=on_token is not None
+                )
+                with response:
+                    if response.status_code == 200:
+                        if on_token:
+                            result = read_llm_stream(response, forward)
+                        else:
+                            result = response.json()['choices'][0]['message']['content']
+                        self.breaker.record_success()
+                        self._count("successes")
+                        return result
+                    print(f"API请求失败，尝试 {attempt + 1}/{retry}，状态码：{response.status_code}")
+                    print(f"响应内容：{response.text}")
+                error_delay = 1  # 失败后短暂延迟再重试
+            except Exception as e:
+                print(f"API调用异常 (尝试 {attempt + 1}/{retry})：{str(e)}")
+                error_delay = 2  # 异常后稍长延迟再重试
+            finally:
+                self._record_latency(time.time() - start)
+                self._slots.release()
+
+            self._count("errors")
+            self.breaker.record_failure()
+            if streamed or attempt == retry - 1:
+                break
+            time.sleep(error_delay)
+
+        return None
+
+    def stats(self):
+        """返回调用次数、错误数、延迟与熔断状态"""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["latency_avg"] = round(stats["latency_total"] / stats["requests"], 4) if stats["requests"] else 0
+        stats["circuit_state"] = self.breaker.state
+        return stats
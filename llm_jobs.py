@@ -0,0 +1,152 @@
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+"""
+大模型后台分析任务
+
+/analyze 不再同步等待大模型，而是把提示交给有界的后台任务队列后立即返回页面；
+页面通过轮询接口或 Server-Sent Events 获取分析结果，流式调用时逐段推送生成的文本。
+任务 ID 即大模型缓存键，其他 worker 进程可以通过共享缓存查询到已完成的结果。
+失败的任务结束后立即从队列中移除（再次提交相同提示时会重新调用上游），失败状态交给 on_failed 回调记录。
+"""
+
+LLM_JOB_WORKERS = int(os.getenv("LLM_JOB_WORKERS", 8))  # 同时执行的后台任务数
+LLM_JOB_MAX_PENDING = int(os.getenv("LLM_JOB_MAX_PENDING", 64))  # 允许排队等待的任务数
+LLM_JOB_RETENTION = 600  # 已成功的任务在内存中保留的时间（秒）
+LLM_JOB_FAILURE_TEXT = "分析服务暂时不可用，请稍后再试。"
+
+# 任务的终止状态
+TERMINAL_STATUSES = ("done", "failed")
+
+
+class AnalysisJob:
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.status = "pending"  # pending -> running -> done / failed
+        self.chunks = []  # 已生成的文本片段
+        self.result = None  # 最终结果
+        self.finished_at = None
+        self.condition = threading.Condition()
+
+    def append(self, chunk):
+        """追加一段流式生成的文本，并唤醒等待中的读取方"""
+        with self.condition:
+            self.chunks.append(chunk)
+            self.condition.notify_all()
+
+    def finish(self, result, failed=False):
+        with self.condition:
+            self.result = result
+            self.status = "failed" if failed else "done"
+            self.finished_at = time.time()
+            self.condition.notify_all()
+
+    def snapshot(self):
+        """返回任务当前状态，用于轮询接口"""
+        with self.condition:
+            text = self.result if self.status in TERMINAL_STATUSES else "".join(self.chunks)
+            return {"job_id": self.job_id, "status": self.status, "text": text}
+
+    def iter_events(self, timeout=120):
+        """
+        逐个产出任务事件，直到任务完成或超时
+
+        Yields:
+            tuple: ("token", 文本片段)、("done", 最终结果)、("failed", 失败说明) 或 ("timeout", None)
+        """
+        sent = 0
+        deadline = time.time() + timeout
+        while True:
+            with self.condition:
+                while sent == len(self.chunks) and self.status not in TERMINAL_STATUSES:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                chunks = self.chunks[sent:]
+                sent = len(self.chunks)
+                status, result = self.status, self.result
+            for chunk in chunks:
+                yield "token", chunk
+            if status in TERMINAL_STATUSES:
+                yield status, result
+                return
+            if time.time() >= deadline:
+                yield "timeout", None
+                return
+
+
+class AnalysisJobQueue:
+    def __init__(self, workers=LLM_JOB_WORKERS, max_pending=LLM_JOB_MAX_PENDING, on_failed=None,
+                 failure_text=LLM_JOB_FAILURE_TEXT):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-job")
+        # 运行中与排队中的任务总数上限，超过时拒绝新任务
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._on_failed = on_failed  # 任务失败时调用 on_failed(job_id, 失败说明)，用于让其他 worker 看到失败状态
+        self._failure_text = failure_text
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def submit(self, job_id, run):
+        """
+        提交后台任务，相同 ID 的任务只会执行一次
+
+        Args:
+            job_id (str): 任务 ID
+            run (callable): 任务函数，接收 on_token 回调并返回最终结果文本，失败时返回 None 或抛出异常
+
+        Returns:
+            AnalysisJob: 任务对象，队列已满时返回 None
+        """
+        with self._lock:
+            self._purge()
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return job
+            if not self._slots.acquire(blocking=False):
+                return None
+            job = AnalysisJob(job_id)
+            self._jobs[job_id] = job
+        self._executor.submit(self._run, job, run)
+        return job
+
+    def _run(self, job, run):
+        job.status = "running"
+        try:
+            result = run(job.append)
+            failed = result is None
+        except Exception as e:
+            result = f"生成失败：{e}"
+            failed = True
+        finally:
+            self._slots.release()
+        if not failed:
+            job.finish(result)
+            return
+
+        if result is None:
+            result = self._failure_text
+        if self._on_failed is not None:
+            try:
+                self._on_failed(job.job_id, result)
+            except Exception as e:
+                print(f"记录失败任务 {job.job_id} 时出错: {e}")
+        # 失败的任务不保留，再次提交相同提示时重新调用上游
+        with self._lock:
+            if self._jobs.get(job.job_id) is job:
+                del self._jobs[job.job_id]
+        job.finish(result, failed=True)
+
+    def _purge(self):
+        # 清理过期的已成功任务
+        now = time.time()
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished_at is not None and now - job.finished_at > LLM_JOB_RETENTION]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,132 @@
+import os
+import csv
+import sys
+import json
+import mmap
+
+"""
+README 存储
+
+所有 README 的 UTF-8 文本依次写入一个数据文件（.dat），另存一个 仓库名 -> (偏移, 长度) 的索引文件（.idx.json）；
+读取时用 mmap 打开数据文件，按需返回单个仓库 README 的零拷贝切片，进程内存中不再常驻全部 README 文本。
+
+使用方法（从 CSV 构建）：
+    python readme_store.py screen_data/repo_readme_contents.csv screen_data/readme_store
+"""
+
+
+def data_path(prefix):
+    return prefix + '.dat'
+
+
+def index_path(prefix):
+    return prefix + '.idx.json'
+
+
+class ReadmeStoreWriter:
+    """顺序写入 README，close 时写出索引；文件先写到临时路径，完成后原子替换"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._tmp_data_path = f"{data_path(prefix)}.{os.getpid()}.tmp"  # 多进程同时构建时互不干扰
+        self._data = open(self._tmp_data_path, 'wb')
+        self._index = {}
+        self._offset = 0
+
+    def add(self, repo, text):
+        """写入一个仓库的 README，重复的仓库名保留第一次写入的内容"""
+        if repo in self._index:
+            return
+        encoded = (text if isinstance(text, str) else "").encode('utf-8')
+        self._data.write(encoded)
+        self._index[repo] = (self._offset, len(encoded))
+        self._offset += len(encoded)
+
+    def close(self):
+        self._data.flush()
+        os.fsync(self._data.fileno())
+        self._data.close()
+        tmp_index_path = f"{index_path(self.prefix)}.{os.getpid()}.tmp"
+        with open(tmp_index_path, 'w', encoding='utf-8') as f:
+            json.dump(self._index, f, ensure_ascii=False)
+        # 先替换数据文件再替换索引，索引中的偏移总能在数据文件中找到
+        os.replace(self._tmp_data_path, data_path(self.prefix))
+        os.replace(tmp_index_path, index_path(self.prefix))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._data.close()
+            os.remove(self._tmp_data_path)
+
+
+class ReadmeStore:
+    """只读的 README 存储，通过 mmap 按需读取"""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        with open(index_path(prefix), 'r', encoding='utf-8') as f:
+            self._index = json.load(f)
+        self._file = open(data_path(prefix), 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        # 空文件无法 mmap
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._view = memoryview(self._mmap)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, repo):
+        return repo in self._index
+
+    def __iter__(self):
+        """按写入顺序遍历仓库名"""
+        return iter(self._index)
+
+    def get(self, repo):
+        """返回仓库 README 的零拷贝切片（memoryview），不存在时返回 None"""
+        entry = self._index.get(repo)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._view[offset:offset + length]
+
+    def get_text(self, repo):
+        """返回仓库 README 的文本，不存在时返回 None"""
+        view = self.get(repo)
+        if view is None:
+            return None
+        return str(view, 'utf-8')
+
+    def close(self):
+        self._view.release()
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+
+def exists(prefix):
+    return os.path.exists(data_path(prefix)) and os.path.exists(index_path(prefix))
+
+
+def build_from_csv(csv_path, prefix):
+    """从 repo,readme_text 格式的 CSV 构建 README 存储"""
+    csv.field_size_limit(2 ** 31 - 1)  # README 可能超过默认的字段长度限制
+    count = 0
+    with open(csv_path, 'r', newline='', encoding='utf-8') as csvfile, ReadmeStoreWriter(prefix) as writer:
+        for row in csv.DictReader(csvfile):
+            writer.add(str(row['repo']), row['readme_text'])
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("用法: python readme_store.py <repo_readme_contents.csv> <输出路径前缀>")
+        sys.exit(1)
+    total = build_from_csv(sys.argv[1], sys.argv[2])
+    print(f"已写入 {total} 条 README 到 {data_path(sys.argv[2])}")
@@ -0,0 +1,147 @@
+import os
+import time
+import hashlib
+import pandas as pd
+import readme_store
+
+"""
+网页服务数据构建
+
+离线把 screen_data 下的 CSV 合并为一个带类型的服务数据文件（pickle），
+加权分数、来源链接等派生列在构建时就计算好，app.py 启动时只需读取这一个文件；
+README 文本写入 readme_store，运行时通过 mmap 按需读取。
+同时生成首页柱状图 static/top_projects_chart.png，服务进程无需导入 matplotlib。
+
+使用方法：
+    python serving_data.py
+"""
+
+total_data_path = 'screen_data/total.csv'
+source_data_path = 'screen_data/source.csv'
+readme_data_path = 'screen_data/repo_readme_contents.csv'
+artifact_path = 'screen_data/serving_data.pkl'
+readme_store_prefix = 'screen_data/readme_store'
+chart_path = os.path.join('static', 'top_projects_chart.png')
+
+SOURCE_PATHS = [total_data_path, source_data_path, readme_data_path]
+
+# 以分类类型保存的字符串列
+STRING_COLUMNS = ['repo_name', 'platform', 'source']
+
+
+def load_total_data():
+    """加载评分数据与来源数据，计算加权分数和来源链接"""
+    data = pd.read_csv(total_data_path, encoding='utf-8')
+    for col in ['complexity_score', 'innovation_score', 'popularity_score']:
+        data[col] = pd.to_numeric(data[col], errors='coerce')  # 确保数值列为浮点型
+    data['repo_name'] = data['repo_name'].astype(str)  # 确保仓库名为字符串
+    data.fillna(0, inplace=True)  # 填充缺失值为 0
+
+    # 动态计算加权分数
+    data['weighted_score'] = (
+            data['complexity_score'] +
+            data['innovation_score'] -
+            data['popularity_score']
+    )
+
+    # 合并来源数据
+    source_data = pd.read_csv(source_data_path, encoding='utf-8')
+    data = data.merge(source_data, on='repo_name', how='left')  # 左连接，基于 repo_name 合并
+
+    # 根据 platform 和 repo_name 生成 source 列（向量化拼接，platform 缺失时为"未知"）
+    data['source'] = ('https://' + data['platform'] + '.com/' + data['repo_name']).where(
+        data['platform'].notna(), "未知")
+
+    # 字符串列转为分类类型：每列只是一个整数编码数组加一份取值表，
+    # gunicorn 预加载后各 worker 按编码读取，不会逐行触碰共享的字符串对象
+    for col in STRING_COLUMNS:
+        data[col] = data[col].astype('category')
+    return data
+
+
+def build_readme_store(prefix=readme_store_prefix):
+    """把 README CSV 转为 mmap 读取的 README 存储"""
+    if os.path.exists(readme_data_path):
+        readme_store.build_from_csv(readme_data_path, prefix)
+    else:
+        print(f"文件 {readme_data_path} 未找到，README 数据为空。")
+        readme_store.ReadmeStoreWriter(prefix).close()
+
+
+def data_version():
+    """根据源 CSV 内容计算数据版本号"""
+    digest = hashlib.sha256()
+    for path in SOURCE_PATHS:
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                for block in iter(lambda: f.read(1 << 20), b''):
+                    digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+def render_top_chart(total_data, path=chart_path):
+    """生成综合评分前 10 项目的柱状图"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    top_projects = total_data.nlargest(10, 'weighted_score')
+    plt.figure(figsize=(10, 6))
+    plt.barh(top_projects['repo_name'], top_projects['weighted_score'], color='skyblue')
+    plt.xlabel('Weighted Score')
+    plt.ylabel('Repository Name')
+    plt.title('Top 10 Repositories by Weighted Score')
+    plt.gca().invert_yaxis()
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)  # 确保 static 文件夹存在
+    plt.savefig(path)
+    plt.close()
+
+
+def build_serving_data():
+    """从 CSV 构建服务数据（评分表），README 单独写入 README 存储"""
+    build_readme_store()
+    return {
+        'version': data_version(),
+        'built_at': time.time(),
+        'total_data': load_total_data(),
+    }
+
+
+def is_stale(path=artifact_path):
+    """服务数据文件或 README 存储不存在，或早于任一源 CSV 时视为过期"""
+    if not os.path.exists(path) or not readme_store.exists(readme_store_prefix):
+        return True
+    built = min(os.path.getmtime(path), os.path.getmtime(readme_store.data_path(readme_store_prefix)))
+    return any(os.path.exists(src) and os.path.getmtime(src) > built for src in SOURCE_PATHS)
+
+
+def load_serving_data(path=artifact_path):
+    """
+    加载服务数据，文件缺失或过期时退回到直接读取 CSV
+
+    Returns:
+        dict: 包含 version、built_at、total_data 与 readme_store（ReadmeStore）
+    """
+    if is_stale(path):
+        print(f"服务数据 {path} 不存在或已过期，直接从 CSV 加载（可运行 python serving_data.py 预先构建）。")
+        serving_data = build_serving_data()
+    else:
+        serving_data = pd.read_pickle(path)
+    serving_data['readme_store'] = readme_store.ReadmeStore(readme_store_prefix)
+    return serving_data
+
+
+def main():
+    start = time.time()
+    serving_data = build_serving_data()
+    tmp_path = artifact_path + '.tmp'
+    pd.to_pickle(serving_data, tmp_path)
+    os.replace(tmp_path, artifact_path)
+    render_top_chart(serving_data['total_data'])
+    print(f"服务数据已保存到 {artifact_path}（版本 {serving_data['version']}，"
+          f"{len(serving_data['total_data'])} 个仓库，耗时 {time.time() - start:.2f} 秒）")
+
+
+if __name__ == "__main__":
+    main()
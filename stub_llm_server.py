@@ -0,0 +1,56 @@
+import os
+import json
+import time
+import random
+from flask import Flask, request, jsonify, Response
+
+"""
+本地大模型桩服务
+
+模拟 chat.ecnu.edu.cn 的 chat/completions 接口（支持 stream 流式返回），
+用于在不访问真实服务的情况下测试 /analyze 的吞吐量。
+
+使用方法：
+    STUB_LLM_LATENCY=15 python stub_llm_server.py
+    CLOUD_LLM_API_URL=http://127.0.0.1:5001/open/api/v1/chat/completions gunicorn app:app
+"""
+
+app = Flask(__name__)
+
+STUB_LLM_LATENCY = float(os.getenv("STUB_LLM_LATENCY", 5))  # 模拟的生成总耗时（秒）
+STUB_LLM_CHUNKS = int(os.getenv("STUB_LLM_CHUNKS", 20))  # 流式返回的片段数
+STUB_LLM_ERROR_RATE = float(os.getenv("STUB_LLM_ERROR_RATE", 0))  # 模拟上游故障的概率，用于测试熔断
+
+STUB_REPLY = (
+    "1. 流行度低的原因：项目缺乏推广，README 未说明使用场景。\n"
+    "2. 项目优化建议：补充示例代码，发布到开发者社区。\n"
+    "3. README改进建议：增加安装步骤和功能截图。\n"
+)
+
+
+@app.route('/open/api/v1/chat/completions', methods=['POST'])
+def chat_completions():
+    data = request.get_json(force=True)
+    if random.random() < STUB_LLM_ERROR_RATE:
+        return jsonify({"error": "stub upstream failure"}), 503
+
+    if not data.get('stream'):
+        time.sleep(STUB_LLM_LATENCY)
+        return jsonify({
+            "model": data.get('model'),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": STUB_REPLY}}]
+        })
+
+    def events():
+        step = max(1, len(STUB_REPLY) // STUB_LLM_CHUNKS)
+        for start in range(0, len(STUB_REPLY), step):
+            time.sleep(STUB_LLM_LATENCY / STUB_LLM_CHUNKS)
+            chunk = {"choices": [{"index": 0, "delta": {"content": STUB_REPLY[start:start + step]}}]}
+            yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return Response(events(), mimetype='text/event-stream')
+
+
+if __name__ == '__main__':
+    app.run(port=int(os.getenv("STUB_LLM_PORT", 5001)), threaded=True)
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+import threading
+import tempfile
+from collections import OrderedDict
+
+"""
+词云图片缓存
+
+图片以 README 文本和渲染参数的哈希命名，相同内容只渲染一次；
+词频单独缓存在内存中，渲染参数变化时无需重新分词；
+磁盘目录按最近访问时间做 LRU 淘汰，总大小不超过配置的字节预算。
+"""
+
+WORDCLOUD_DIR = os.path.join('static', 'wordclouds')
+WORDCLOUD_CACHE_BYTES = int(os.getenv("WORDCLOUD_CACHE_BYTES", 256 * 1024 * 1024))  # 磁盘缓存字节预算
+FREQUENCY_CACHE_SIZE = 1024  # 内存中保留的词频表数量
+
+# 词云渲染参数，参与缓存键计算
+WORDCLOUD_PARAMS = {
+    "width": 800,
+    "height": 400,
+    "background_color": None,  # 透明背景
+    "mode": "RGBA",
+    "colormap": "viridis",
+    # "font_path": "static/fonts/simhei.ttf"  # 指定支持中文的字体
+}
+
+_frequency_cache = OrderedDict()
+_lock = threading.Lock()
+
+
+def text_digest(text):
+    """计算 README 文本的哈希"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def cache_key(text, params=None):
+    """根据 README 文本和渲染参数计算缓存键"""
+    params = WORDCLOUD_PARAMS if params is None else params
+    payload = json.dumps(params, sort_keys=True) + "\n" + text_digest(text)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_frequencies(text):
+    """获取 README 的词频表，同一文本只统计一次"""
+    digest = text_digest(text)
+    with _lock:
+        frequencies = _frequency_cache.get(digest)
+        if frequencies is not None:
+            _frequency_cache.move_to_end(digest)
+            return frequencies
+
+    from wordcloud import WordCloud  # 延迟导入，缓存命中时不加载 matplotlib / PIL
+    frequencies = WordCloud().process_text(text)
+
+    with _lock:
+        _frequency_cache[digest] = frequencies
+        while len(_frequency_cache) > FREQUENCY_CACHE_SIZE:
+            _frequency_cache.popitem(last=False)
+    return frequencies
+
+
+def evict(directory=WORDCLOUD_DIR, budget=WORDCLOUD_CACHE_BYTES):
+    """按最近访问时间淘汰词云图片，直到目录总大小不超过预算"""
+    entries = []
+    total_size = 0
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.name.endswith('.png') and not entry.name.startswith('.'):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total_size += stat.st_size
+    if total_size <= budget:
+        return
+
+    entries.sort()  # 最久未访问的排在最前
+    for _, size, path in entries:
+        if total_size <= budget:
+            break
+        try:
+            os.remove(path)
+            total_size -= size
+        except FileNotFoundError:
+            pass  # 已被其他进程删除
+
+
+def get_wordcloud(text, params=None, directory=WORDCLOUD_DIR, budget=WORDCLOUD_CACHE_BYTES):
+    """
+    获取 README 对应的词云图片路径，缓存未命中时才渲染
+
+    Args:
+        text (str): README 文本
+        params (dict): 词云渲染参数，默认使用 WORDCLOUD_PARAMS
+        directory (str): 词云图片缓存目录
+        budget (int): 缓存目录的字节预算
+
+    Returns:
+        str: 词云图片路径，README 中没有可用词时返回 None
+    """
+    params = WORDCLOUD_PARAMS if params is None else params
+    path = os.path.join(directory, f"{cache_key(text, params)}.png").replace(os.sep, '/')
+
+    if os.path.exists(path):
+        try:
+            os.utime(path)  # 更新访问时间，用于 LRU 淘汰
+            return path
+        except FileNotFoundError:
+            pass  # 刚好被淘汰，重新渲染
+
+    os.makedirs(directory, exist_ok=True)
+    frequencies = get_frequencies(text)
+    if not frequencies:
+        return None  # 没有可用于生成词云的词
+
+    from wordcloud import WordCloud
+    wordcloud = WordCloud(**params).generate_from_frequencies(frequencies)
+
+    # 先写入临时文件再原子替换，避免并发请求读到写了一半的图片
+    fd, tmp_path = tempfile.mkstemp(prefix='.tmp-', suffix='.png', dir=directory)
+    os.close(fd)
+    try:
+        wordcloud.to_file(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    evict(directory, budget)
+    return path